@@ -0,0 +1,104 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from dataset import load_dataset
+from correlation import BINARY_FEATURES, COLUMNS, compute_spearman_correlations, plot_binary_feature_boxplots, plot_heatmap
+from repo_db import parse_where
+from figure_generation.sections import plot_section_counts, section_counts
+from figure_generation.threshold import plot_threshold_curve
+from figure_generation.tokens_dist import plot_token_distribution, plot_token_histogram
+from summary_cube import SummaryCube
+
+
+def _hash_inputs(name: str, func, args: tuple) -> str:
+    h = hashlib.sha256(name.encode())
+    # The whole module the plot function lives in, so edits to it or its helpers re-render
+    with open(inspect.getsourcefile(func), "rb") as f:
+        h.update(f.read())
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(arg, index=True).to_numpy().tobytes())
+            h.update(str(list(arg.columns) if isinstance(arg, pd.DataFrame) else arg.name).encode())
+        else:
+            h.update(np.ascontiguousarray(arg).tobytes())
+    return h.hexdigest()
+
+
+def _render(func, args: tuple, out_path: str) -> str:
+    func(*args, out_path=out_path, show=False)
+    return out_path
+
+
+def figure_jobs(df: pd.DataFrame, curve: pd.DataFrame | None, cube: SummaryCube | None = None) -> dict:
+    """Figure name -> (plot function, already-aggregated inputs, output file)
+
+    Section and token-count figures are drawn from the summary cube when there
+    is one, and from the row-level frame otherwise.
+    """
+    jobs = {
+        "heatmap": (plot_heatmap, (compute_spearman_correlations(df),), "heatmap.png"),
+        "section_boxplot_50th": (plot_binary_feature_boxplots, (df[["stars"] + BINARY_FEATURES],), "section_boxplot_50th.png"),
+    }
+    if cube is not None:
+        jobs["section_counts"] = (plot_section_counts, (cube.value_counts("total_sections", minlength=8),), "section_counts.png")
+        jobs["token_distribution"] = (plot_token_histogram, cube.histogram("token_count"), "token_distribution.png")
+    else:
+        jobs["section_counts"] = (plot_section_counts, (section_counts(df),), "section_counts.png")
+        jobs["token_distribution"] = (plot_token_distribution, (df["token_count"],), "token_distribution.png")
+    if curve is not None:
+        jobs["threshold_curve"] = (plot_threshold_curve, (curve,), "threshold_curve.png")
+    return jobs
+
+
+def build(data_path: str, curve_path: str, out_dir: str, force: bool = False, workers: int | None = None,
+          summary_path: str | None = None, where: dict | None = None):
+    """`data_path` may be the repo_db .sqlite file; `where` then restricts every figure to the matching rows"""
+    os.makedirs(out_dir, exist_ok=True)
+    cache_path = os.path.join(out_dir, ".figure_hashes.json")
+    cache = {}
+    if os.path.exists(cache_path) and not force:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    df = load_dataset(data_path, columns=COLUMNS, where=where)
+    curve = pd.read_csv(curve_path) if os.path.exists(curve_path) else None
+    # The cube summarizes the whole corpus, so it can't stand in for a filtered subset
+    cube = SummaryCube.load(summary_path) if summary_path and os.path.exists(summary_path) and not where else None
+    todo = {}
+    for name, (func, args, filename) in figure_jobs(df, curve, cube).items():
+        out_path = os.path.join(out_dir, filename)
+        digest = _hash_inputs(name, func, args)
+        if cache.get(name) == digest and os.path.exists(out_path):
+            print(f"  = {name} unchanged, skipping")
+            continue
+        todo[name] = (func, args, out_path, digest)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(_render, func, args, out_path) for name, (func, args, out_path, _) in todo.items()}
+        for name, future in futures.items():
+            print(f"  ✓ {name} -> {future.result()}")
+            cache[name] = todo[name][3]
+    with open(cache_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    print(f"Rendered {len(todo)} figure(s) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every figure headlessly from one load of the dataset")
+    parser.add_argument("--data", default="../data/repo_data_numbers.csv", help="the dataset CSV, or the repo_db .sqlite file")
+    parser.add_argument("--curve", default="../data/threshold_curve.csv")
+    parser.add_argument("--summary", default="../data/repo_data_summary.json", help="summary cube written with the dataset")
+    parser.add_argument("--out", default="../figures")
+    parser.add_argument("--force", action="store_true", help="re-render even if inputs are unchanged")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("where", nargs="*", help="filters such as language=Python token_count>500 (database only)")
+    args = parser.parse_args()
+    build(args.data, args.curve, args.out, force=args.force, workers=args.workers, summary_path=args.summary,
+          where=parse_where(args.where))
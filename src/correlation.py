@@ -1,8 +1,13 @@
+import argparse
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
-from scipy.stats import pointbiserialr
+from scipy.stats import rankdata
+from scipy.stats import t as t_dist
+from dataset import DATA_PATH, load_dataset
+from feature_registry import BINARY_FEATURES, CONTINUOUS_FEATURES
+from repo_db import parse_where
 
 SUCCESS_METRICS = [
     "stars",
@@ -10,80 +15,107 @@ SUCCESS_METRICS = [
     "contributors",
 ]
 
-BINARY_FEATURES = [
-    "has_description",
-    "has_installation",
-    "has_usage",
-    "has_contributing",
-    "has_license",
-    "has_toc",
-    "has_credits",
-]
+BINARY_SUCCESS_LABEL = "successful"
+# Everything the correlations and plots read, so callers can load only these columns
+COLUMNS = SUCCESS_METRICS + CONTINUOUS_FEATURES + BINARY_FEATURES
 
-CONTINUOUS_FEATURES = [
-    "token_count",
-    "noun_count",
-    "verb_count",
-    "adj_count",
-    "section_count",
-    "total_sections",
-    "header_count",
-    "code_block_count",
-    "inline_code_count",
-    "image_count",
-    "list_item_count",
-    "completeness_score",
-    "avg_word_length",
-    "avg_sentence_length",
-    "flesch_kincade",
-    "flesch_reading_ease",
-    "gunning_fog",
-    "dale_chall",
-    "difficult_words",
-    "sentiment_polarity",
-    "sentiment_subjectivity",
-]
+def _present(df: pd.DataFrame, cols: list[str]) -> list[str]:
+    return [c for c in cols if c in df.columns]
+
+
+def _standardize(a: np.ndarray) -> np.ndarray:
+    """Center and unit-normalize along the sample axis (-2); constant columns become NaN"""
+    a = a - a.mean(axis=-2, keepdims=True)
+    norm = np.sqrt((a * a).sum(axis=-2, keepdims=True))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return a / norm
+
+
+def _cross_corr(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """Pearson r between every column of X and every column of Y: (..., n, p) x (..., n, q) -> (..., p, q)"""
+    return np.clip(np.matmul(np.swapaxes(_standardize(X), -1, -2), _standardize(Y)), -1.0, 1.0)
+
+
+def _pvalues(r: np.ndarray, n: int) -> np.ndarray:
+    """Two-sided p-value of r under H0: rho = 0 (same t-test scipy's spearmanr/pointbiserialr use)"""
+    dof = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+    return 2 * t_dist.sf(np.abs(t), dof)
+
+
+def _matrices(df: pd.DataFrame, features: list[str], metrics: list[str], method: str):
+    data = df[features + metrics].dropna().to_numpy(dtype=np.float64)
+    if method == "spearman":
+        data = rankdata(data, axis=0)
+    return data[:, :len(features)], data[:, len(features):]
 
-BINARY_SUCCESS_LABEL = "successful"
 
 def compute_spearman_correlations(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [c for c in CONTINUOUS_FEATURES + SUCCESS_METRICS if c in df.columns]
-    corr = df[cols].corr(method="spearman")
-    rows = [c for c in CONTINUOUS_FEATURES if c in corr.index]
-    cols = [c for c in SUCCESS_METRICS if c in corr.columns]
-    return corr.loc[rows, cols]
+    rows = _present(df, CONTINUOUS_FEATURES)
+    cols = _present(df, SUCCESS_METRICS)
+    X, Y = _matrices(df, rows, cols, "spearman")
+    return pd.DataFrame(_cross_corr(X, Y), index=rows, columns=cols)
 
 
 def compute_pointbiserial_correlations(df: pd.DataFrame) -> pd.DataFrame:
-    res = []
-    row_names = []
-    col_names = [m for m in SUCCESS_METRICS if m in df.columns]
-    for feature in BINARY_FEATURES:
-        if feature not in df.columns:
-            continue
-        row = []
-        for metric in col_names:
-            x = df[feature]
-            y = df[metric]
-            mask = x.notna() & y.notna()
-            x_valid = x[mask]
-            y_valid = y[mask]
-            if x_valid.nunique() <= 1:
-                corr_val = np.nan
-            else:
-                try:
-                    corr_val, _ = pointbiserialr(x_valid, y_valid)
-                except Exception:
-                    corr_val = np.nan
-            row.append(corr_val)
-        res.append(row)
-        row_names.append(feature)
-    if not res:
+    rows = _present(df, BINARY_FEATURES)
+    cols = _present(df, SUCCESS_METRICS)
+    if not rows:
         return pd.DataFrame()
-    return pd.DataFrame(res, index=row_names, columns=col_names)
-
-
-def plot_binary_feature_boxplots(df):
+    # Point-biserial r is Pearson r with a 0/1 variable
+    X, Y = _matrices(df, rows, cols, "pearson")
+    return pd.DataFrame(_cross_corr(X, Y), index=rows, columns=cols)
+
+
+def bootstrap_correlations(
+    df: pd.DataFrame,
+    features: list[str],
+    metrics: list[str] = SUCCESS_METRICS,
+    method: str = "spearman",
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    random_state: int = 42,
+    max_chunk_bytes: int = 256 * 2**20,
+) -> pd.DataFrame:
+    """Correlations with analytic p-values and percentile bootstrap CIs.
+
+    Resamples are drawn and correlated in chunks of shape (chunk, n, p + q), so
+    thousands of resamples cost a handful of batched rank + matmul calls.
+    """
+    features = _present(df, features)
+    metrics = _present(df, metrics)
+    data = df[features + metrics].dropna().to_numpy(dtype=np.float64)
+    n, k = data.shape
+    ranked = rankdata(data, axis=0) if method == "spearman" else data
+    r = _cross_corr(ranked[:, :len(features)], ranked[:, len(features):])
+    rng = np.random.default_rng(random_state)
+    chunk = max(1, int(max_chunk_bytes // (n * k * 8)))
+    boot = []
+    for start in range(0, n_resamples, chunk):
+        idx = rng.integers(0, n, size=(min(chunk, n_resamples - start), n))
+        sample = data[idx]
+        if method == "spearman":
+            sample = rankdata(sample, axis=1)
+        boot.append(_cross_corr(sample[..., :len(features)], sample[..., len(features):]))
+    boot = np.concatenate(boot)
+    alpha = (1 - confidence) / 2
+    low, high = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+    # Two-sided: twice the share of resamples on the far side of zero
+    p_boot = np.minimum(1.0, 2 * np.minimum((boot <= 0).mean(axis=0), (boot >= 0).mean(axis=0)))
+    feature_idx, metric_idx = np.meshgrid(np.arange(len(features)), np.arange(len(metrics)), indexing="ij")
+    return pd.DataFrame({
+        "feature": np.array(features)[feature_idx.ravel()],
+        "metric": np.array(metrics)[metric_idx.ravel()],
+        "r": r.ravel(),
+        "p_value": _pvalues(r, n).ravel(),
+        "ci_low": low.ravel(),
+        "ci_high": high.ravel(),
+        "p_bootstrap": p_boot.ravel(),
+    })
+
+
+def plot_binary_feature_boxplots(df, out_path="../figures/section_boxplot_50th.png", show=True):
     star_col = "stars"
     section_cols = [
         "has_contributing",
@@ -128,11 +160,13 @@ def plot_binary_feature_boxplots(df):
     plt.xticks(rotation=45, ha="right")
     plt.legend(title="", loc="upper right")
     plt.tight_layout()
-    plt.savefig("../figures/section_boxplot_50th.png", dpi=300)
-    plt.show()
+    plt.savefig(out_path, dpi=300)
+    if show:
+        plt.show()
+    plt.close()
 
 
-def plot_heatmap(corr_df: pd.DataFrame) -> None:
+def plot_heatmap(corr_df: pd.DataFrame, out_path: str = "../figures/heatmap.png", show: bool = True) -> None:
     fig, ax = plt.subplots(figsize=(8, 6))
     im = ax.imshow(corr_df.values, aspect="auto")
     ax.set_xticks(np.arange(len(corr_df.columns)))
@@ -141,9 +175,11 @@ def plot_heatmap(corr_df: pd.DataFrame) -> None:
     ax.set_yticklabels(corr_df.index)
     ax.set_title("Correlation matrix heatmap")
     fig.colorbar(im, ax=ax, label="Spearman correlation")
-    fig.savefig("../figures/heatmap.png")
     fig.tight_layout()
-    plt.show()
+    fig.savefig(out_path)
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
 def print_top_correlations(corr_df: pd.DataFrame, top_k: int = 10) -> None:
@@ -161,9 +197,18 @@ def print_top_correlations(corr_df: pd.DataFrame, top_k: int = 10) -> None:
 
 
 if __name__ == "__main__":
-    df = pd.read_csv("../data/repo_data_numbers.csv")
+    parser = argparse.ArgumentParser(description="Correlations between README features and success metrics")
+    parser.add_argument("--data", default=DATA_PATH, help="repo_data_numbers.csv, or the repo_db .sqlite file")
+    parser.add_argument("where", nargs="*", help="filters such as language=Python token_count>500 (database only)")
+    args = parser.parse_args()
+    df = load_dataset(args.data, columns=COLUMNS, where=parse_where(args.where))
     pearson_corr = compute_spearman_correlations(df)
     print_top_correlations(pearson_corr, top_k=15)
     pb_corr = compute_pointbiserial_correlations(df)
+    ci = pd.concat([
+        bootstrap_correlations(df, CONTINUOUS_FEATURES, method="spearman"),
+        bootstrap_correlations(df, BINARY_FEATURES, method="pearson"),
+    ])
+    print(ci.sort_values("r", key=np.abs, ascending=False).head(15).to_string(index=False))
     plot_heatmap(pearson_corr)
     plot_binary_feature_boxplots(df)
@@ -0,0 +1,95 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from feature_registry import FEATURES, README_FEATURES
+from repo_db import RepoDB
+from snapshot_store import GROWTH_WINDOW_DAYS, SNAPSHOT_COLUMNS
+
+DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "repo_data_numbers.csv"))
+README_DTYPES = {"binary": "uint8", "count": "uint32", "continuous": "float32"}
+
+# Canonical dtypes of repo_data_numbers.csv, in column order
+SCHEMA = {
+    "name": "object",
+    "owner": "category",
+    "language": "category",
+    "stars": "uint32",
+    "forks": "uint32",
+    "contributors": "uint32",
+    "commits": "uint32",
+    "repo_age_days": "uint16",
+    "repo_age_years": "float32",
+    "stars_per_day": "float32",
+    "forks_per_day": "float32",
+    "commits_per_day": "float32",
+    "fork_to_star_ratio": "float32",
+    "commits_per_contributor": "float32",
+    "log_stars": "float32",
+    "log_forks": "float32",
+    "log_contributors": "float32",
+    "popularity_score": "float32",
+    "engagement_score": "float32",
+    "is_highly_starred": "uint8",
+    "is_highly_forked": "uint8",
+    "is_active": "uint8",
+    **{name: README_DTYPES[f.kind] for name, f in FEATURES.items()},
+    # Present only when preprocessing ran with a snapshot store
+    **{f"{c}_gained_{GROWTH_WINDOW_DAYS}d": "float32" for c in SNAPSHOT_COLUMNS},
+    "snapshot_days": "float32",
+}
+
+
+def load_dataset(path: str = DATA_PATH, columns: list[str] | None = None, where: dict | None = None) -> pd.DataFrame:
+    """repo_data_numbers.csv in the compact SCHEMA dtypes.
+
+    `path` may also be the repo_db SQLite file; `where` (RepoDB.select filters)
+    is then evaluated in SQL so only the matching rows are read.
+    """
+    if path.endswith('.sqlite'):
+        df = RepoDB(path).select('repo_features', columns, where)
+        return df.astype({c: SCHEMA[c] for c in df.columns if c in SCHEMA})
+    if where:
+        raise ValueError("where filters need the repo_db database, not the CSV")
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns]
+    schema = {c: SCHEMA[c] for c in usecols if c in SCHEMA}
+    # Strings are typed while parsing; numbers are cast after, since counts that
+    # went through a NaN-holding concat are written as "12.0"
+    df = pd.read_csv(path, usecols=usecols, dtype={c: t for c, t in schema.items() if t in ("object", "category")})
+    return df.astype(schema)
+
+
+def feature_matrix(df: pd.DataFrame, columns: list[str] = README_FEATURES) -> np.ndarray:
+    """C-contiguous float32 (rows, features) matrix for the models"""
+    return np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+
+
+def feature_frame(df: pd.DataFrame, columns: list[str] = README_FEATURES) -> pd.DataFrame:
+    """feature_matrix with its column names, for estimators that select columns by name"""
+    return pd.DataFrame(feature_matrix(df, columns), columns=columns, index=df.index)
+
+
+def memory_report(path: str = DATA_PATH) -> pd.DataFrame:
+    """Per-column bytes with pandas' default dtypes vs SCHEMA"""
+    default = pd.read_csv(path)
+    typed = load_dataset(path)
+    report = pd.DataFrame({
+        "default_dtype": default.dtypes.astype(str),
+        "default_bytes": default.memory_usage(deep=True, index=False),
+        "typed_dtype": typed.dtypes.astype(str),
+        "typed_bytes": typed.memory_usage(deep=True, index=False),
+    })
+    report.loc["total"] = ["", report["default_bytes"].sum(), "", report["typed_bytes"].sum()]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory footprint of repo_data_numbers.csv with and without the typed schema")
+    parser.add_argument("--data", default=DATA_PATH)
+    args = parser.parse_args()
+    report = memory_report(args.data)
+    print(report.to_string())
+    total = report.loc["total"]
+    print(f"{total['default_bytes'] / 1e6:.1f} MB -> {total['typed_bytes'] / 1e6:.1f} MB "
+          f"({1 - total['typed_bytes'] / total['default_bytes']:.0%} smaller)")
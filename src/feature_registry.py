@@ -0,0 +1,278 @@
+import re
+import mistune
+import numpy as np
+import pandas as pd
+import textstat
+from textblob import TextBlob
+from completeness import html_parser, struture_completeness
+
+
+class Intermediate:
+    """A per-README value shared by several features (HTML, cleaned text, token stats, ...).
+
+    `batch=True` intermediates get the whole list of inputs at once (the
+    structure pass and spaCy's nlp.pipe); the rest are computed per document.
+    A `compute` of None means the caller has to provide it (e.g. tokens need nlp).
+    """
+    def __init__(self, name: str, inputs: tuple[str, ...], compute=None, batch: bool = False):
+        self.name = name
+        self.inputs = inputs
+        self.compute = compute
+        self.batch = batch
+
+
+class Feature:
+    def __init__(self, name: str, kind: str, inputs: tuple[str, ...], compute):
+        self.name = name
+        self.kind = kind  # 'binary', 'count' or 'continuous'
+        self.inputs = inputs
+        self.compute = compute
+
+
+def clean_html(html_readme: str, max_len: int | None = 100000, include_table_data: bool = False) -> str:
+    parser = html_parser()
+    parser.feed(html_readme)
+    text = " ".join(parser.heading_data + parser.text_data + (parser.table_data if include_table_data else []))
+    if max_len is not None:
+        text = text[:max_len]
+    return text
+
+
+def avg_sentence_length(text: str):
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 1]
+    if not sentences:
+        return 0
+    word_counts = [len(s.split()) for s in sentences]
+    return sum(word_counts) / len(word_counts)
+
+
+def chunk_text(text: str, chunk_chars: int) -> list[str]:
+    """Split cleaned text at sentence ends into pieces of at most ~chunk_chars characters"""
+    chunks, current, size = [], [], 0
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        # A single run-on "sentence" longer than a chunk is cut at whitespace
+        while len(sentence) > chunk_chars:
+            cut = sentence.rfind(' ', 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and size + len(sentence) + 1 > chunk_chars:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return [c for c in chunks if c.strip()] or [""]
+
+
+def _readability(text: str) -> dict[str, float]:
+    return {
+        'flesch_kincade': textstat.flesch_kincaid_grade(text),
+        'flesch_reading_ease': textstat.flesch_reading_ease(text),
+        'gunning_fog': textstat.gunning_fog(text),
+        'dale_chall': textstat.dale_chall_readability_score(text),
+        'difficult_words': textstat.difficult_words(text),
+    }
+
+
+def _chunked_readability(text: str, chunk_chars: int) -> dict[str, float]:
+    """textstat's readability formulas over raw counts added up chunk by chunk.
+
+    Words, sentences, syllables and difficult-word occurrences add up across
+    chunks cut at sentence ends. 'difficult_words' is textstat's count of
+    unique words, so it is one set over the whole text.
+    """
+    if len(text) <= chunk_chars:
+        return _readability(text)
+    words = sentences = syllables = fog_hard = dale_hard = 0
+    unique_difficult = set()
+    for chunk in chunk_text(text, chunk_chars):
+        words += textstat.lexicon_count(chunk)
+        sentences += textstat.sentence_count(chunk)
+        syllables += textstat.syllable_count(chunk)
+        # Same syllable thresholds as textstat: 3 for Gunning fog (en), 0 for Dale-Chall, 2 for difficult_words
+        fog_hard += len(textstat.difficult_words_list(chunk, 3, unique=False))
+        dale_hard += len(textstat.difficult_words_list(chunk, 0, unique=False))
+        unique_difficult.update(textstat.difficult_words_list(chunk, 2, unique=True))
+    if not words:
+        return {name: 0 for name in _readability("")}
+    per_sentence = words / sentences if sentences else 0
+    per_word = syllables / words
+    pct_dale = 100 * dale_hard / words
+    flesch = per_sentence and per_word
+    return {
+        'flesch_kincade': 0.39 * per_sentence + 11.8 * per_word - 15.59 if flesch else 0.0,
+        'flesch_reading_ease': 206.835 - 1.015 * per_sentence - 84.6 * per_word if flesch else 0.0,
+        'gunning_fog': 0.4 * (per_sentence + 100 * fog_hard / words),
+        'dale_chall': 0.1579 * pct_dale + 0.0496 * per_sentence + (3.6365 if pct_dale > 5 else 0),
+        'difficult_words': len(unique_difficult),
+    }
+
+
+def _chunked_tokens(provider, chunk_chars: int):
+    """Wrap a tokens provider so long texts go through it in chunks.
+
+    Counts are summed and lemmas joined per original text, so the output has
+    one entry per input text, like the provider's own.
+    """
+    def compute(texts):
+        owners, chunks = [], []
+        for i, text in enumerate(texts):
+            pieces = chunk_text(text, chunk_chars) if len(text) > chunk_chars else [text]
+            owners.extend([i] * len(pieces))
+            chunks.extend(pieces)
+        counts = [None] * len(texts)
+        lemmas = [[] for _ in texts]
+        for i, stats in zip(owners, provider(chunks)):
+            if stats is None:
+                continue
+            counts[i] = stats[:4] if counts[i] is None else tuple(a + b for a, b in zip(counts[i], stats[:4]))
+            lemmas[i].append(stats[4])
+        return [None if c is None else c + (" ".join(l),) for c, l in zip(counts, lemmas)]
+    return compute
+
+
+def _structure(html_readmes: list[str]) -> list[dict[str, int]]:
+    sc = struture_completeness(html_readmes)
+    sc.compute()
+    return [sc.get_readme_completeness(h) for h in html_readmes]
+
+
+def _sentiment(text: str) -> tuple[float, float]:
+    try:
+        blob = TextBlob(text)
+        return blob.sentiment.polarity, blob.sentiment.subjectivity
+    except Exception:
+        return 0, 0
+
+
+SECTIONS = {
+    'has_description': 'description',
+    'has_installation': 'installation',
+    'has_usage': 'usage',
+    'has_contributing': 'contribution',
+    'has_license': 'license',
+    'has_toc': 'table_of_contents',
+    'has_credits': 'credits',
+}
+
+INTERMEDIATES = {i.name: i for i in [
+    Intermediate('markdown', ()),
+    Intermediate('html', ('markdown',), lambda d: mistune.html(d['markdown'])),
+    Intermediate('structure', ('html',), _structure, batch=True),
+    Intermediate('text_with_tables', ('html',), lambda d: clean_html(d['html'], include_table_data=True)),
+    Intermediate('text', ('html',), lambda d: clean_html(d['html'], include_table_data=False)),
+    # (token_count, noun_count, verb_count, adj_count, lemmas) or None if spaCy failed
+    Intermediate('tokens', ('text_with_tables',), batch=True),
+    Intermediate('sentiment', ('text_with_tables',), lambda d: _sentiment(d['text_with_tables'])),
+    Intermediate('words', ('text',), lambda d: d['text'].split()),
+    Intermediate('readability', ('text',), lambda d: _readability(d['text'])),
+]}
+
+
+def _long_intermediates(chunk_chars: int) -> dict[str, Intermediate]:
+    """Untruncated text, with readability counted chunk by chunk"""
+    return {i.name: i for i in [
+        Intermediate('text_with_tables', ('html',), lambda d: clean_html(d['html'], max_len=None, include_table_data=True)),
+        Intermediate('text', ('html',), lambda d: clean_html(d['html'], max_len=None, include_table_data=False)),
+        Intermediate('readability', ('text',), lambda d: _chunked_readability(d['text'], chunk_chars)),
+    ]}
+
+
+def _token_stat(i: int):
+    def compute(d):
+        if d['tokens'] is not None:
+            return d['tokens'][i]
+        # spaCy unavailable: whitespace token count, no POS counts
+        return len(d['text_with_tables'].split()) if i == 0 else 0
+    return compute
+
+
+def _completeness(d) -> list[int]:
+    return [d['structure'][section] for section in SECTIONS.values()]
+
+
+# Registration order is the column order of repo_data_numbers.csv
+FEATURES = {f.name: f for f in [
+    Feature('token_count', 'count', ('tokens', 'text_with_tables'), _token_stat(0)),
+    Feature('noun_count', 'count', ('tokens', 'text_with_tables'), _token_stat(1)),
+    Feature('verb_count', 'count', ('tokens', 'text_with_tables'), _token_stat(2)),
+    Feature('adj_count', 'count', ('tokens', 'text_with_tables'), _token_stat(3)),
+    Feature('header_count', 'count', ('structure',), lambda d: d['structure']['heading_cnt']),
+    Feature('code_block_count', 'count', ('structure',), lambda d: d['structure']['code_block_cnt']),
+    Feature('inline_code_count', 'count', ('structure',), lambda d: d['structure']['inline_code_cnt']),
+    Feature('image_count', 'count', ('structure',), lambda d: d['structure']['image_cnt']),
+    Feature('list_item_count', 'count', ('structure',), lambda d: d['structure']['list_item_cnt']),
+    *[Feature(name, 'binary', ('structure',), (lambda section: lambda d: d['structure'][section])(section))
+      for name, section in SECTIONS.items()],
+    Feature('section_count', 'count', ('structure',), lambda d: d['structure']['total']),
+    Feature('sentiment_polarity', 'continuous', ('sentiment',), lambda d: d['sentiment'][0]),
+    Feature('sentiment_subjectivity', 'continuous', ('sentiment',), lambda d: d['sentiment'][1]),
+    Feature('avg_word_length', 'continuous', ('words',), lambda d: np.mean([len(w) for w in d['words']]) if d['words'] else 0),
+    Feature('avg_sentence_length', 'continuous', ('text',), lambda d: avg_sentence_length(d['text'])),
+    *[Feature(name, kind, ('readability',), (lambda name: lambda d: d['readability'][name])(name))
+      for name, kind in [('flesch_kincade', 'continuous'), ('flesch_reading_ease', 'continuous'),
+                         ('gunning_fog', 'continuous'), ('dale_chall', 'continuous'), ('difficult_words', 'count')]],
+    Feature('completeness_score', 'continuous', ('structure',), lambda d: sum(_completeness(d)) / len(SECTIONS)),
+    Feature('total_sections', 'count', ('structure',), lambda d: sum(_completeness(d))),
+]}
+
+README_FEATURES = list(FEATURES)
+BINARY_FEATURES = [name for name, f in FEATURES.items() if f.kind == 'binary']
+CONTINUOUS_FEATURES = [name for name, f in FEATURES.items() if f.kind != 'binary']
+
+
+def plan(features: list[str], intermediates: dict[str, Intermediate] = INTERMEDIATES) -> list[str]:
+    """Intermediates the requested features need, dependencies first, each exactly once"""
+    order: list[str] = []
+
+    def visit(name):
+        if name in order:
+            return
+        for dep in intermediates[name].inputs:
+            visit(dep)
+        order.append(name)
+
+    for feature in features:
+        for name in FEATURES[feature].inputs:
+            visit(name)
+    return order
+
+
+def compute_features(readmes: list[str], features: list[str] | None = None, providers: dict | None = None,
+                     chunk_chars: int | None = None, computed: dict | None = None) -> pd.DataFrame:
+    """Compute only `features` (default: all) for each README, sharing intermediates.
+
+    `providers` supplies batch intermediates the registry can't compute itself,
+    e.g. {'tokens': fn(list_of_texts) -> list_of_token_stats}.
+    With `chunk_chars`, text is no longer truncated: texts longer than that are
+    tokenized and readability-counted in chunks and the counts are added up.
+    `computed`, if given, receives each intermediate's per-README values by name.
+    """
+    features = features or README_FEATURES
+    providers = dict(providers or {})
+    intermediates = INTERMEDIATES
+    if chunk_chars:
+        intermediates = {**INTERMEDIATES, **_long_intermediates(chunk_chars)}
+        if 'tokens' in providers:
+            providers['tokens'] = _chunked_tokens(providers['tokens'], chunk_chars)
+    docs = [{'markdown': r} for r in readmes]
+    for name in plan(features, intermediates):
+        if name == 'markdown':
+            continue
+        step = intermediates[name]
+        compute = providers.get(name, step.compute)
+        if compute is None:
+            raise ValueError(f"Intermediate '{name}' needs a provider")
+        print(f"Computing {name} for {len(docs)} READMEs")
+        if step.batch:
+            values = compute([d[step.inputs[0]] for d in docs])
+        else:
+            values = [compute(d) for d in docs]
+        for d, v in zip(docs, values):
+            d[name] = v
+        if computed is not None:
+            computed[name] = [d[name] for d in docs]
+    return pd.DataFrame([{f: FEATURES[f].compute(d) for f in features} for d in docs], columns=features)
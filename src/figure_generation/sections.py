@@ -1,14 +1,32 @@
+import os
+import sys
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from summary_cube import SummaryCube
 
-df = pd.read_csv("../../data/repo_data_numbers.csv")
-total_sections = [0, 1, 2, 3, 4, 5, 6, 7]
-counts = [0] * 8
-for _, row in df.iterrows():
-    total = int(row["total_sections"])
-    counts[total] += 1
-bars = plt.bar(total_sections, counts,color="#54487A")
-plt.bar_label(bars)
-plt.xlabel("Amount of Sections in README")
-plt.ylabel("Amount of Repositories")
-plt.show()
+
+def section_counts(df: pd.DataFrame) -> np.ndarray:
+    return np.bincount(df["total_sections"].to_numpy(dtype=int), minlength=8)
+
+
+def plot_section_counts(counts: np.ndarray, out_path: str | None = None, show: bool = True):
+    total_sections = np.arange(len(counts))
+    bars = plt.bar(total_sections, counts, color="#54487A")
+    plt.bar_label(bars)
+    plt.xlabel("Amount of Sections in README")
+    plt.ylabel("Amount of Repositories")
+    if out_path:
+        plt.savefig(out_path, dpi=300)
+    if show:
+        plt.show()
+    plt.close()
+
+
+if __name__ == "__main__":
+    summary_path = "../../data/repo_data_summary.json"
+    if os.path.exists(summary_path):
+        plot_section_counts(SummaryCube.load(summary_path).value_counts("total_sections", minlength=8))
+    else:
+        plot_section_counts(section_counts(pd.read_csv("../../data/repo_data_numbers.csv")))
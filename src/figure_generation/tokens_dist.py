@@ -3,8 +3,34 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
-df = pd.read_csv("../../data/repo_data_numbers.csv")
-sns.histplot(df["token_count"], bins=100)
-plt.ylabel('Number of Repositories')
-plt.xlim(0, 3000)
-plt.show()
+
+def plot_token_distribution(token_count: pd.Series, out_path: str | None = None, show: bool = True):
+    sns.histplot(token_count, bins=100)
+    plt.ylabel('Number of Repositories')
+    plt.xlim(0, 3000)
+    if out_path:
+        plt.savefig(out_path, dpi=300)
+    if show:
+        plt.show()
+    plt.close()
+
+
+def plot_token_histogram(edges: np.ndarray, counts: np.ndarray, out_path: str | None = None, show: bool = True):
+    """Same seaborn figure from the summary cube's pre-binned token_count histogram.
+
+    The cube's bins are fixed 30-token bins over 0..3000 (the last one holds longer
+    READMEs too), not 100 bins over the full data range, so bar widths differ.
+    """
+    sns.histplot(pd.DataFrame({"token_count": edges[:-1], "repos": counts}), x="token_count", weights="repos", bins=list(edges))
+    plt.ylabel('Number of Repositories')
+    plt.xlim(0, 3000)
+    if out_path:
+        plt.savefig(out_path, dpi=300)
+    if show:
+        plt.show()
+    plt.close()
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("../../data/repo_data_numbers.csv")
+    plot_token_distribution(df["token_count"])
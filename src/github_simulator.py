@@ -0,0 +1,371 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from query_planner import SEARCH_RESULT_CAP
+
+LANGUAGES = ['JavaScript', 'Python', 'Java', 'TypeScript', 'C#', 'C++', 'PHP', 'Shell', 'C', 'Ruby']
+SENTENCES = [
+    "This project provides a small library for parsing configuration files.",
+    "It was written to make everyday automation tasks easier to maintain.",
+    "Install the package with your usual package manager before running the examples.",
+    "The usage section below shows how to load a file and print the result.",
+    "Contributions are welcome, so please open an issue before sending a large change.",
+    "The code is released under the MIT license and can be used in commercial work.",
+    "We test every release on the latest stable versions of the supported platforms.",
+    "A command line tool is included for people who prefer working in the terminal.",
+    "Documentation for every public function lives in the docs folder of this repository.",
+    "Performance matters to us, and the benchmarks folder tracks it over time.",
+    "Bug reports should include the version you are running and a minimal example.",
+    "The project follows semantic versioning, so breaking changes only land in major releases.",
+    "Each module is small and focused, which keeps the learning curve gentle.",
+    "Examples cover reading data, transforming it and writing it back to disk.",
+    "The roadmap lists the features we plan to build during the next few months.",
+    "Thanks to everyone who reported issues and helped improve the documentation.",
+    "If you find this tool useful, consider starring the repository to show support.",
+    "The configuration format supports comments, includes and environment variables.",
+    "Logging can be turned up for debugging or silenced entirely in production.",
+    "Plugins let you extend the behavior without forking the whole project.",
+]
+NON_ENGLISH = "Este proyecto ofrece una biblioteca sencilla para leer archivos de configuración y automatizar tareas. " * 3
+
+
+def _cursor(offset: int) -> str:
+    return base64.b64encode(f"cursor:{offset}".encode('utf-8')).decode('ascii')
+
+
+def _offset(cursor: str | None) -> int:
+    return int(base64.b64decode(cursor).decode('utf-8').split(':')[1]) if cursor else 0
+
+
+class Corpus:
+    """Repositories the simulator serves: synthetic, or replayed from a scraped raw_repos.csv"""
+    def __init__(self, repos: pd.DataFrame):
+        self.repos = repos.sort_values(['created_at', 'owner', 'name']).reset_index(drop=True)
+        self.by_id = {f"{o}/{n}": i for i, (o, n) in enumerate(zip(self.repos['owner'], self.repos['name']))}
+
+
+    @classmethod
+    def synthetic(cls, n_repos: int = 20000, seed: int = 42, fork_rate: float = 0.1,
+                  duplicate_rate: float = 0.05, empty_rate: float = 0.05, non_english_rate: float = 0.05):
+        rng = np.random.default_rng(seed)
+        start = date(2015, 1, 1)
+        days = (date(2025, 12, 31) - start).days
+        readmes = []
+        for i in range(n_repos):
+            u = rng.random()
+            if u < empty_rate:
+                readmes.append('')
+            elif u < empty_rate + non_english_rate:
+                readmes.append(f"# repo{i}\n\n{NON_ENGLISH}")
+            elif u < empty_rate + non_english_rate + duplicate_rate and readmes:
+                readmes.append(readmes[int(rng.integers(len(readmes)))])
+            else:
+                picked = rng.choice(len(SENTENCES), size=8, replace=False)
+                readmes.append(f"# repo{i}\n\n" + " ".join(SENTENCES[j] for j in picked) + f"\n\nBuilt by team {i}.")
+        return cls(pd.DataFrame({
+            'name': [f"repo{i}" for i in range(n_repos)],
+            'owner': [f"user{i % max(1, n_repos // 3)}" for i in range(n_repos)],
+            'stars': np.minimum(rng.lognormal(4, 1.6, n_repos).astype(int) + 5, 5000),
+            'forks': rng.lognormal(2, 1.5, n_repos).astype(int),
+            'contributors': rng.geometric(0.15, n_repos) - 1,
+            'commits': rng.lognormal(5, 1.5, n_repos).astype(int) + 1,
+            'language': rng.choice(LANGUAGES, n_repos),
+            'created_at': [(start + timedelta(days=int(d))).isoformat() + "T00:00:00Z" for d in rng.integers(0, days, n_repos)],
+            'is_fork': rng.random(n_repos) < fork_rate,
+            'readme': readmes,
+        }))
+
+
+    @classmethod
+    def from_csv(cls, path: str):
+        df = pd.read_csv(path).fillna({'readme': ''})
+        df['is_fork'] = False
+        return cls(df)
+
+
+    def search(self, query: str) -> pd.DataFrame:
+        """Rows matching a search string as the scraper builds them (language, stars, fork, created)"""
+        mask = np.ones(len(self.repos), dtype=bool)
+        for term in query.split():
+            key, _, value = term.partition(':')
+            if key == 'language':
+                mask &= (self.repos['language'] == value).to_numpy()
+            elif key == 'stars':
+                lo, _, hi = value.partition('..')
+                mask &= self.repos['stars'].between(int(lo), int(hi or lo)).to_numpy()
+            elif key == 'created':
+                lo, _, hi = value.partition('..')
+                day = self.repos['created_at'].str[:10]
+                mask &= ((day >= lo) & (day <= (hi or lo))).to_numpy()
+            elif key == 'fork' and value == 'false':
+                mask &= ~self.repos['is_fork'].to_numpy()
+        hits = self.repos[mask]
+        if 'sort:created-asc' not in query:
+            hits = hits.sort_values('stars', ascending=False, kind='stable')
+        return hits
+
+
+def _blob_oid(text: str) -> str:
+    """Git's blob id for a README, so edited READMEs get a new oid like on GitHub"""
+    data = text.encode('utf-8')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _node(row, with_readme: bool) -> dict:
+    node = {
+        'name': row['name'],
+        'owner': {'login': row['owner']},
+        'stargazerCount': int(row['stars']),
+        'forkCount': int(row['forks']),
+        'isFork': bool(row['is_fork']),
+        'createdAt': row['created_at'],
+        'primaryLanguage': {'name': row['language']},
+        'defaultBranchRef': {'target': {'history': {'totalCount': int(row['commits'])}}},
+    }
+    if with_readme:
+        node['object'] = {'oid': _blob_oid(row['readme']), 'text': row['readme']} if row['readme'] else None
+    return node
+
+
+class GitHubSimulator:
+    """Local stand-in for api.github.com's GraphQL search/rateLimit and REST /contributors.
+
+    Each GraphQL request costs one point from a `rate_limit` budget, and each
+    REST request one point from a separate `rest_rate_limit` budget, as on
+    GitHub. Both reset every `window_seconds`; an empty budget answers 403
+    until `resetAt`. REST responses carry the X-RateLimit-* headers.
+    `error_rate` injects random 403/429 responses and `latency_ms` delays every
+    request, so backoff, pagination and resume can be exercised reproducibly.
+    """
+    def __init__(self, corpus: Corpus, latency_ms: float = 0, error_rate: float = 0.0,
+                 rate_limit: int = 5000, window_seconds: float = 3600, seed: int = 0, rest_rate_limit: int = 5000):
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.limits = {'graphql': rate_limit, 'core': rest_rate_limit}
+        self.window_seconds = window_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.window_start = time.time()
+        self.remaining = dict(self.limits)
+        self.server = None
+
+
+    def _reset_at(self) -> str:
+        reset = datetime.fromtimestamp(self.window_start + self.window_seconds, tz=timezone.utc)
+        return reset.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+    def rate_limit_headers(self, resource: str = 'core') -> dict:
+        limit, remaining = self.limits[resource], self.remaining[resource]
+        return {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Used': str(limit - remaining),
+            'X-RateLimit-Reset': str(int(self.window_start + self.window_seconds)),
+            'X-RateLimit-Resource': resource,
+        }
+
+
+    def _admit(self, kind: str, cost: int = 1, resource: str = 'graphql') -> int | None:
+        """Account for one request; returns an error status to send instead, or None"""
+        with self.lock:
+            self.stats[kind] += 1
+            now = time.time()
+            if now - self.window_start >= self.window_seconds:
+                self.window_start, self.remaining = now, dict(self.limits)
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats['injected_errors'] += 1
+                return self.random.choice([403, 429])
+            if self.remaining[resource] < cost:
+                self.stats['rate_limited'] += 1
+                return 403
+            self.remaining[resource] -= cost
+            return None
+
+
+    def graphql(self, body: dict) -> tuple[int, dict]:
+        query, variables = body.get('query', ''), body.get('variables') or {}
+        if 'search(' in query:
+            kind = 'search' if 'nodes' in query else 'count'
+        elif 'repository(' in query:
+            kind = 'readmes' if 'Blob' in query else 'refresh'
+        else:
+            kind = 'rate_limit'
+        # Checking the rate limit is free on GitHub too
+        status = self._admit(kind, cost=0 if kind == 'rate_limit' else 1)
+        if status:
+            return status, {'message': 'API rate limit exceeded', 'documentation_url': 'https://docs.github.com'}
+        data = {}
+        if kind == 'count':
+            data['search'] = {'repositoryCount': len(self.corpus.search(variables['query']))}
+        elif kind == 'search':
+            hits = self.corpus.search(variables['query'])
+            offset = _offset(variables.get('cursor'))
+            end = min(offset + int(variables.get('first', 10)), len(hits), SEARCH_RESULT_CAP)
+            page = hits.iloc[offset:end]
+            data['search'] = {
+                'repositoryCount': len(hits),
+                'pageInfo': {'hasNextPage': end < min(len(hits), SEARCH_RESULT_CAP), 'endCursor': _cursor(end)},
+                'nodes': [_node(row, variables.get('withReadme', True)) for _, row in page.iterrows()],
+            }
+        elif kind in ('readmes', 'refresh'):
+            i = 0
+            while f"o{i}" in variables:
+                row = self.corpus.by_id.get(f"{variables[f'o{i}']}/{variables[f'n{i}']}")
+                # Serves both README batches and metadata refreshes; extra fields are harmless
+                data[f"r{i}"] = _node(self.corpus.repos.iloc[row], True) if row is not None else None
+                i += 1
+        data['rateLimit'] = {'remaining': self.remaining['graphql'], 'resetAt': self._reset_at()}
+        return 200, {'data': data}
+
+
+    def contributors(self, owner: str, name: str, query: dict) -> tuple[int, object, dict]:
+        status = self._admit('contributors', resource='core')
+        headers = self.rate_limit_headers('core')
+        if status:
+            if status == 429:
+                headers['Retry-After'] = '1'
+            return status, {'message': 'API rate limit exceeded'}, headers
+        row = self.corpus.by_id.get(f"{owner}/{name}")
+        if row is None:
+            return 404, {'message': 'Not Found'}, headers
+        count = int(self.corpus.repos.at[row, 'contributors'])
+        if count == 0:
+            return 204, None, headers
+        per_page = int(query.get('per_page', ['30'])[0])
+        page = max(1, int(query.get('page', ['1'])[0]))
+        pages = -(-count // per_page)
+        url = f"{self.url}/repos/{owner}/{name}/contributors?per_page={per_page}&anon=true"
+        links = []
+        if page > 1:
+            links += [f'<{url}&page={page - 1}>; rel="prev"', f'<{url}&page=1>; rel="first"']
+        if page < pages:
+            links += [f'<{url}&page={page + 1}>; rel="next"', f'<{url}&page={pages}>; rel="last"']
+        if links:
+            headers['Link'] = ", ".join(links)
+        first = (page - 1) * per_page
+        return 200, [{'login': f"contributor{i}", 'contributions': 1} for i in range(first, min(first + per_page, count))], headers
+
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self.server = ThreadingHTTPServer((host, port), make_handler(self))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.url
+
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def make_handler(sim: GitHubSimulator):
+    class GitHubHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body, headers: dict | None = None):
+            payload = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+
+        def do_GET(self):
+            if sim.latency_ms:
+                time.sleep(sim.latency_ms / 1000)
+            url = urlparse(self.path)
+            parts = url.path.strip('/').split('/')
+            if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'contributors':
+                self._send(*sim.contributors(parts[1], parts[2], parse_qs(url.query)))
+            else:
+                self._send(404, {'message': 'Not Found'})
+
+
+        def do_POST(self):
+            if sim.latency_ms:
+                time.sleep(sim.latency_ms / 1000)
+            if self.path != '/graphql':
+                self._send(404, {'message': 'Not Found'})
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            self._send(*sim.graphql(body))
+
+
+        def log_message(self, format, *args):
+            pass
+
+    return GitHubHandler
+
+
+def benchmark(corpus: Corpus, target_count: int = 500, two_phase: bool = True, **sim_kwargs) -> dict:
+    """Run scrape_repos against a fresh simulator and report throughput and request cost"""
+    import requests
+    from selection import GitHubScraper
+    sim = GitHubSimulator(corpus, **sim_kwargs)
+    url = sim.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = GitHubScraper('simulated', readme_index_path=None, api_url=url, session=requests.Session())
+            start = time.perf_counter()
+            repos = scraper.scrape_repos(target_count=target_count, output_path=os.path.join(tmp, 'raw_repos.csv'),
+                                         two_phase=two_phase)
+            elapsed = time.perf_counter() - start
+    finally:
+        sim.stop()
+    accepted = len(repos)
+    requests_made = sum(v for k, v in sim.stats.items() if k not in ('injected_errors', 'rate_limited'))
+    return {
+        'two_phase': two_phase,
+        'accepted': accepted,
+        'seconds': elapsed,
+        'repos_per_minute': 60 * accepted / elapsed if elapsed else float('inf'),
+        'requests': requests_made,
+        'requests_per_repo': requests_made / accepted if accepted else float('inf'),
+        'readme_downloads': scraper.readme_downloads,
+        **{f"requests_{k}": v for k, v in sim.stats.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GitHubScraper.scrape_repos against a local GitHub API simulator")
+    parser.add_argument('--repos', type=int, default=20000, help="size of the synthetic corpus")
+    parser.add_argument('--replay', help="serve the repos of a scraped raw_repos.csv instead")
+    parser.add_argument('--target', type=int, default=500)
+    parser.add_argument('--mode', choices=['single', 'two-phase', 'both'], default='both')
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=5000, help="GraphQL points per window")
+    parser.add_argument('--rest-rate-limit', type=int, default=5000, help="REST requests per window")
+    parser.add_argument('--window-seconds', type=float, default=3600)
+    args = parser.parse_args()
+
+    corpus = Corpus.from_csv(args.replay) if args.replay else Corpus.synthetic(args.repos)
+    modes = {'single': [False], 'two-phase': [True], 'both': [False, True]}[args.mode]
+    results = [
+        benchmark(corpus, args.target, two_phase, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                  rate_limit=args.rate_limit, rest_rate_limit=args.rest_rate_limit, window_seconds=args.window_seconds)
+        for two_phase in modes
+    ]
+    print(pd.DataFrame(results).set_index('two_phase').T.to_string())
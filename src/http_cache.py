@@ -0,0 +1,121 @@
+import hashlib
+from json import dumps, loads
+import os
+import sqlite3
+import time
+from collections import Counter
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CachedResponse:
+    """The parts of requests.Response the scraper reads, rebuilt from the cache"""
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = True
+
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+
+    def json(self):
+        return loads(self.content)
+
+
+class CachedSession:
+    """Persistent HTTP cache that can stand in for `requests` under GitHubScraper.
+
+    REST GETs are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged resource comes back as a 304 with no body. GraphQL POSTs have no
+    validators and always go to the network. README texts are instead kept by
+    git blob oid (blob/store_blob): the scraper asks for the oids first and
+    only downloads texts it has never seen, so an edited README, which gets a
+    new oid, is never served stale.
+    """
+    def __init__(self, path: str = 'http_cache.sqlite', session=None):
+        self.session = session or requests.Session()
+        self.stats = Counter()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                stored_at REAL
+            )
+        """)
+        self.db.execute("CREATE TABLE IF NOT EXISTS blobs (oid TEXT PRIMARY KEY, text TEXT)")
+        self.db.commit()
+
+
+    def _key(self, method: str, url: str, payload) -> str:
+        return hashlib.sha256(f"{method} {url} {dumps(payload, sort_keys=True)}".encode('utf-8')).hexdigest()
+
+
+    def _lookup(self, key: str):
+        return self.db.execute(
+            "SELECT etag, last_modified, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+
+    def _store(self, key: str, r):
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, r.headers.get('ETag'), r.headers.get('Last-Modified'), r.status_code,
+             dumps(dict(r.headers)), r.content, time.time()),
+        )
+        self.db.commit()
+
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        key = self._key('GET', url, params)
+        entry = self._lookup(key)
+        headers = dict(headers or {})
+        if entry:
+            etag, last_modified = entry[0], entry[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        r = self.session.get(url, headers=headers, params=params, timeout=timeout)
+        if r.status_code == 304 and entry:
+            self.stats['revalidated'] += 1
+            self.db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+            return CachedResponse(entry[2], loads(entry[3]), entry[4])
+        self.stats['miss'] += 1
+        if r.status_code == 200 and (r.headers.get('ETag') or r.headers.get('Last-Modified')):
+            self._store(key, r)
+        return r
+
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.stats['graphql'] += 1
+        return self.session.post(url, json=json, headers=headers, timeout=timeout)
+
+
+    def blob(self, oid: str) -> str | None:
+        """Cached text of a git blob, or None if it was never downloaded"""
+        row = self.db.execute("SELECT text FROM blobs WHERE oid = ?", (oid,)).fetchone()
+        self.stats['blob_hit' if row else 'blob_miss'] += 1
+        return row[0] if row else None
+
+
+    def store_blob(self, oid: str, text: str):
+        self.db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?)", (oid, text))
+        self.db.commit()
+
+
+    def report(self) -> str:
+        return (f"HTTP cache: {self.stats['revalidated']} revalidated (304), {self.stats['miss']} misses of "
+                f"{self.stats['revalidated'] + self.stats['miss']} GETs; {self.stats['graphql']} GraphQL requests; "
+                f"README blobs {self.stats['blob_hit']} reused, {self.stats['blob_miss']} downloaded")
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+import langdetect
+import numpy as np
+import pandas as pd
+from langdetect import DetectorFactory, LangDetectException, detect_langs
+from sklearn.feature_extraction.text import CountVectorizer
+
+# langdetect's own per-language character 1-3-gram counts, installed with the package
+NGRAM_PROFILES = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+FASTTEXT_MODEL = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models", "lid.176.ftz"))
+FASTTEXT_MODEL_URL = "https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.ftz"
+
+
+class LanguageIdentifier(ABC):
+    """Scores a batch of texts; each result is [(lang, prob), ...] best first, or [] if undecidable"""
+    name = "base"
+
+    @abstractmethod
+    def predict_batch(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        ...
+
+
+class LangDetectBackend(LanguageIdentifier):
+    """The original langdetect path, seeded so repeated runs agree"""
+    name = "langdetect"
+
+    def __init__(self, seed: int = 0):
+        DetectorFactory.seed = seed
+
+
+    def predict_batch(self, texts):
+        res = []
+        for text in texts:
+            try:
+                res.append([(lp.lang, lp.prob) for lp in detect_langs(text)])
+            except LangDetectException:
+                res.append([])
+        return res
+
+
+class FastTextBackend(LanguageIdentifier):
+    """fastText's offline language-ID model (lid.176.ftz, ~1 MB), scored in one native batch call.
+
+    Neither the fasttext package nor the model ships with the repo:
+    pip install fasttext, then download FASTTEXT_MODEL_URL to FASTTEXT_MODEL.
+    """
+    name = "fasttext"
+
+    def __init__(self, model_path: str = FASTTEXT_MODEL, k: int = 3):
+        try:
+            import fasttext
+        except ImportError as e:
+            raise ImportError("The fasttext backend needs the fasttext package (pip install fasttext)") from e
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"fastText language-ID model not found at {model_path}; "
+                                    f"download it from {FASTTEXT_MODEL_URL}")
+        self.model = fasttext.load_model(model_path)
+        self.k = k
+
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
+        # fastText scores one line at a time
+        labels, probs = self.model.predict([" ".join(t.split()) for t in texts], k=self.k)
+        return [
+            [(label.replace("__label__", ""), float(p)) for label, p in zip(ls, ps)]
+            for ls, ps in zip(labels, probs)
+        ]
+
+
+class NgramProfileBackend(LanguageIdentifier):
+    """Naive Bayes over langdetect's bundled n-gram profiles, one sparse matrix product per batch.
+
+    Uses the same 55 language profiles as langdetect, but scores every n-gram of
+    the text deterministically instead of sampling, so it needs no download and
+    no seed. The first `max_chars` of each text are scored.
+    """
+    name = "ngram"
+
+    def __init__(self, profile_dir: str = NGRAM_PROFILES, max_chars: int = 10000, smoothing: float = 0.5, k: int = 3):
+        profiles = []
+        for fname in sorted(os.listdir(profile_dir)):
+            with open(os.path.join(profile_dir, fname), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        self.langs = [p["name"] for p in profiles]
+        vocab = sorted(set().union(*(p["freq"] for p in profiles)))
+        index = {gram: i for i, gram in enumerate(vocab)}
+        lengths = np.array([len(gram) for gram in vocab])
+        # log P(n-gram | language), normalized per n-gram length like langdetect's profiles
+        self.log_prob = np.empty((len(vocab), len(profiles)), dtype=np.float32)
+        for j, p in enumerate(profiles):
+            counts = np.full(len(vocab), smoothing)
+            rows = np.fromiter((index[gram] for gram in p["freq"]), dtype=np.int64, count=len(p["freq"]))
+            counts[rows] += np.fromiter(p["freq"].values(), dtype=np.float64, count=len(p["freq"]))
+            self.log_prob[:, j] = np.log(counts / np.asarray(p["n_words"], dtype=np.float64)[lengths - 1])
+        # char_wb pads each word with spaces, matching the profiles' word-boundary n-grams
+        self.vectorizer = CountVectorizer(analyzer="char_wb", ngram_range=(1, 3), lowercase=False, vocabulary=index)
+        self.max_chars = max_chars
+        self.k = k
+
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
+        X = self.vectorizer.transform([t[:self.max_chars] for t in texts])
+        scores = np.asarray(X @ self.log_prob)
+        scores -= scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        probs /= probs.sum(axis=1, keepdims=True)
+        res = []
+        for row, n_grams in zip(probs, X.getnnz(axis=1)):
+            if not n_grams:
+                res.append([])
+                continue
+            top = np.argsort(row)[::-1][:self.k]
+            res.append([(self.langs[i], float(row[i])) for i in top])
+        return res
+
+
+def get_backend(name: str = "langdetect", **kwargs) -> LanguageIdentifier:
+    backends = {"langdetect": LangDetectBackend, "ngram": NgramProfileBackend, "fasttext": FastTextBackend}
+    return backends[name](**kwargs)
+
+
+def default_backend() -> LanguageIdentifier:
+    """fastText when its package and model are installed, otherwise the bundled n-gram profiles"""
+    try:
+        return FastTextBackend()
+    except (ImportError, OSError, ValueError) as e:
+        print(f"fastText language ID not set up ({e}); using the n-gram profile backend")
+        return NgramProfileBackend()
+
+
+def english_decisions(backend: LanguageIdentifier, proses: list[str], confidence_threshold: float = 0.9):
+    """(is_english, top_lang, en_prob) per prose text, using the scraper's acceptance rule"""
+    out = []
+    for detected in backend.predict_batch(proses):
+        if not detected:
+            out.append((False, None, 0.0))
+            continue
+        lang = detected[0][0]
+        en_prob = next((p for l, p in detected if l == "en"), 0.0)
+        out.append((lang == "en" and en_prob >= confidence_threshold, lang, en_prob))
+    return out
+
+
+if __name__ == "__main__":
+    from selection import GitHubScraper
+    parser = argparse.ArgumentParser(description="Agreement and speed of language-ID backends on a fixed README corpus")
+    parser.add_argument("--data", default="../data/raw_repos.csv")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--fasttext-model", default=FASTTEXT_MODEL)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data, usecols=["owner", "name", "readme"]).dropna()
+    df = df.sort_values(["owner", "name"]).head(args.n)
+    scraper = GitHubScraper(None, readme_index_path=None)
+    proses = [scraper.extract_prose_only(r) for r in df["readme"]]
+    proses = [p for p in proses if len(p) >= 150]
+    results = {}
+    for name, kwargs in [("langdetect", {}), ("ngram", {}), ("fasttext", {"model_path": args.fasttext_model})]:
+        try:
+            backend = get_backend(name, **kwargs)
+        except (ImportError, ValueError, OSError) as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        start = time.perf_counter()
+        results[name] = english_decisions(backend, proses)
+        elapsed = time.perf_counter() - start
+        print(f"{name:10s} {len(proses) / elapsed:8.1f} READMEs/s, {sum(r[0] for r in results[name])}/{len(proses)} English")
+    a = results["langdetect"]
+    for name, b in results.items():
+        if name == "langdetect":
+            continue
+        decision = sum(x[0] == y[0] for x, y in zip(a, b)) / len(a)
+        top = sum(x[1] == y[1] for x, y in zip(a, b)) / len(a)
+        print(f"{name} vs langdetect: agreement on is_english {decision:.2%}, on top language {top:.2%}")
@@ -0,0 +1,39 @@
+import json
+import os
+from datetime import datetime, timezone
+import joblib
+
+ARTIFACT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "artifacts"))
+
+
+def artifact_path(name: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"{name}.joblib")
+
+
+def save_artifact(model, name, feature_columns, y, stars, metrics=None, label="is_highly_starred", idf=None):
+    """Persist a fitted estimator with the feature schema and success threshold it was trained on"""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    negatives = stars[y == 0]
+    metadata = {
+        "name": name,
+        "model_class": type(model).__name__,
+        "feature_columns": list(feature_columns),
+        "label": label,
+        # is_highly_starred = stars > cutoff, where cutoff sits at this percentile
+        "star_percentile": float((y == 0).mean()),
+        "star_cutoff": float(negatives.max()) if len(negatives) else None,
+        "split": {"test_size": 0.2, "random_state": 42, "stratify": label},
+        "metrics": metrics or {},
+        # Trained on feature_columns followed by a README TF-IDF block with this idf
+        "text_features": idf is not None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    joblib.dump({"model": model, "metadata": metadata, "idf": idf}, artifact_path(name))
+    with open(os.path.join(ARTIFACT_DIR, f"{name}.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Saved artifact {artifact_path(name)}")
+    return metadata
+
+
+def load_artifact(name: str) -> dict:
+    return joblib.load(artifact_path(name))
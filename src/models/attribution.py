@@ -0,0 +1,198 @@
+import argparse
+import os
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import DATA_PATH, feature_frame, load_dataset
+from artifacts import ARTIFACT_DIR, load_artifact
+from text_features import combine, load_counts, weigh_text
+
+# The whole TF-IDF block is permuted / attributed as one group, like the RF importance bar
+TEXT_GROUP = "readme_tfidf"
+SHAP_CHUNK_ROWS = 128
+
+
+def attribution_path(name: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"{name}_attribution.joblib")
+
+
+def held_out_split(metadata: dict, idf: np.ndarray | None = None, data_path: str = DATA_PATH):
+    """Rebuild the test split an artifact was evaluated on from its recorded split settings
+
+    The README counts are weighted with the artifact's own idf, which was fit
+    on the training split only.
+    """
+    df = load_dataset(data_path)
+    X = feature_frame(df, metadata["feature_columns"])
+    # Artifacts saved before the TF-IDF block existed have no text_features entry
+    if metadata.get("text_features", False):
+        X = combine(X, load_counts(df, path=os.path.join(os.path.dirname(data_path), "readme_terms")))
+    y = df[metadata["label"]]
+    split = metadata["split"]
+    _, X_test, _, y_test = train_test_split(
+        X, y, test_size=split["test_size"], random_state=split["random_state"], stratify=y
+    )
+    if idf is not None:
+        X_test = weigh_text(X_test, idf, len(metadata["feature_columns"]))
+    return X_test, y_test.to_numpy()
+
+
+def _permuted_scores(model, X, y, column, n_numeric, seeds):
+    """F1 with one column (or the TF-IDF block when column is None) shuffled, once per seed.
+
+    The copy of X is made once per task and reused across repeats; only the
+    shuffled column is rewritten and restored between predictions.
+    """
+    scores = []
+    if sparse.issparse(X):
+        numeric = X[:, :n_numeric].toarray()
+        text = X[:, n_numeric:].tocsr()
+        buffer = numeric.copy()
+        for seed in seeds:
+            perm = np.random.default_rng(seed).permutation(X.shape[0])
+            if column is None:
+                X_perm = sparse.hstack([sparse.csr_matrix(numeric), text[perm]], format="csr")
+            else:
+                buffer[:, column] = numeric[perm, column]
+                X_perm = sparse.hstack([sparse.csr_matrix(buffer), text], format="csr")
+                buffer[:, column] = numeric[:, column]
+            scores.append(f1_score(y, model.predict(X_perm)))
+        return scores
+    buffer = X.copy()
+    name = X.columns[column]
+    original = X[name].to_numpy()
+    for seed in seeds:
+        perm = np.random.default_rng(seed).permutation(X.shape[0])
+        buffer[name] = original[perm]
+        scores.append(f1_score(y, model.predict(buffer)))
+    return scores
+
+
+def permutation_importance(model, X, y, feature_columns, n_repeats: int = 10, n_jobs: int = -1, random_state: int = 42):
+    """Mean/std drop in test F1 when each feature is shuffled, features run in parallel"""
+    n_numeric = len(feature_columns)
+    baseline = f1_score(y, model.predict(X))
+    columns = list(range(n_numeric)) + ([None] if sparse.issparse(X) else [])
+    seeds = np.random.default_rng(random_state).integers(0, 2**31 - 1, size=n_repeats)
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permuted_scores)(model, X, y, column, n_numeric, seeds) for column in columns
+    )
+    drops = baseline - np.asarray(scores)
+    index = list(feature_columns) + ([TEXT_GROUP] if sparse.issparse(X) else [])
+    return pd.DataFrame({"perm_mean": drops.mean(axis=1), "perm_std": drops.std(axis=1)}, index=index)
+
+
+def _group(values: np.ndarray, n_numeric: int, has_text: bool) -> np.ndarray:
+    """Per-column contributions -> numeric columns plus one summed TF-IDF column"""
+    if not has_text:
+        return values[:, :n_numeric]
+    return np.column_stack([values[:, :n_numeric], values[:, n_numeric:].sum(axis=1)])
+
+
+def _rows(X, start, stop):
+    return X.iloc[start:stop] if isinstance(X, pd.DataFrame) else X[start:stop]
+
+
+def _is_catboost(model) -> bool:
+    return type(model).__module__.split(".")[0] == "catboost"
+
+
+def _catboost_shap(model, X, n_numeric, has_text):
+    from catboost import Pool
+    out = []
+    for start in range(0, X.shape[0], SHAP_CHUNK_ROWS):
+        values = model.get_feature_importance(Pool(_rows(X, start, start + SHAP_CHUNK_ROWS)), type="ShapValues")
+        out.append(_group(values[:, :-1], n_numeric, has_text))
+    return np.vstack(out)
+
+
+def _tree_shap(model, X, n_numeric, has_text):
+    try:
+        import shap
+    except ImportError:
+        print("shap is not installed, skipping tree SHAP")
+        return None
+    explainer = shap.TreeExplainer(model)
+    out = []
+    for start in range(0, X.shape[0], SHAP_CHUNK_ROWS):
+        values = explainer.shap_values(_rows(X, start, start + SHAP_CHUNK_ROWS))
+        # Older shap returns one array per class, newer a (rows, features, classes) array
+        values = values[1] if isinstance(values, list) else np.asarray(values)
+        if values.ndim == 3:
+            values = values[..., 1]
+        out.append(_group(np.asarray(values), n_numeric, has_text))
+    return np.vstack(out)
+
+
+def _linear_shap(model, X, n_numeric, has_text):
+    """Exact SHAP for an affine decision function (scaler + linear model pipelines).
+
+    The effective weight of each numeric feature is read off the decision
+    function at the mean row; the TF-IDF group gets whatever is left over.
+    """
+    if isinstance(X, pd.DataFrame):
+        mean = X.mean().to_frame().T
+        probes = pd.DataFrame(mean.to_numpy() + np.eye(n_numeric), columns=X.columns)
+        numeric = X.to_numpy(dtype=float)
+    else:
+        mean = sparse.csr_matrix(np.asarray(X.mean(axis=0)))
+        bumps = sparse.hstack([sparse.eye(n_numeric), sparse.csr_matrix((n_numeric, X.shape[1] - n_numeric))])
+        probes = sparse.vstack([mean] * n_numeric) + bumps
+        numeric = X[:, :n_numeric].toarray()
+    base = model.decision_function(mean)[0]
+    weights = model.decision_function(probes) - base
+    values = (numeric - numeric.mean(axis=0)) * weights
+    if not has_text:
+        return values
+    return np.column_stack([values, model.decision_function(X) - base - values.sum(axis=1)])
+
+
+def shap_values(model, X, n_numeric: int):
+    """(rows, features[+TF-IDF group]) SHAP contributions to the raw model output, or None"""
+    has_text = sparse.issparse(X)
+    if _is_catboost(model):
+        return _catboost_shap(model, X, n_numeric, has_text)
+    if hasattr(model, "estimators_"):
+        return _tree_shap(model, X, n_numeric, has_text)
+    if hasattr(model, "decision_function"):
+        return _linear_shap(model, X, n_numeric, has_text)
+    return None
+
+
+def attribute(name: str, X_test=None, y_test=None, n_repeats: int = 10, n_jobs: int = -1, force: bool = False) -> pd.DataFrame:
+    """Permutation importance and mean |SHAP| for a saved model, cached next to its artifact"""
+    artifact = load_artifact(name)
+    metadata = artifact["metadata"]
+    path = attribution_path(name)
+    if not force and os.path.exists(path):
+        cached = joblib.load(path)
+        if cached["created_at"] == metadata["created_at"] and cached["n_repeats"] >= n_repeats:
+            print(f"Using cached attribution {path}")
+            return cached["report"]
+    if X_test is None:
+        X_test, y_test = held_out_split(metadata, artifact.get("idf"))
+    model = artifact["model"]
+    feature_columns = metadata["feature_columns"]
+    report = permutation_importance(model, X_test, y_test, feature_columns, n_repeats=n_repeats, n_jobs=n_jobs)
+    values = shap_values(model, X_test, len(feature_columns))
+    report["mean_abs_shap"] = np.abs(values).mean(axis=0) if values is not None else np.nan
+    report = report.sort_values("perm_mean", ascending=False)
+    joblib.dump({"created_at": metadata["created_at"], "n_repeats": n_repeats, "report": report}, path)
+    print(f"Saved attribution {path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Permutation importance and SHAP attribution for a saved model")
+    parser.add_argument("--model", default="random_forest", choices=["random_forest", "svm", "catboost"])
+    parser.add_argument("--n-repeats", type=int, default=10)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--force", action="store_true", help="recompute even if a cached report matches the artifact")
+    args = parser.parse_args()
+    print(attribute(args.model, n_repeats=args.n_repeats, n_jobs=args.n_jobs, force=args.force).to_string())
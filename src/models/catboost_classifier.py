@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+from sklearn.model_selection import RandomizedSearchCV, train_test_split
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import feature_frame, load_dataset
+from artifacts import save_artifact
+from attribution import attribute
+from text_features import combine, load_counts, tfidf_split
+from search import SEARCH_MODES, EarlyStoppingClassifier, exhaustive_search, halving_search, memoized_search, search_report
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--search", choices=SEARCH_MODES, default="exhaustive")
+parser.add_argument("--text-features", action="store_true", help="append the sparse README TF-IDF block")
+parser.add_argument("--attribute", action="store_true", help="also run permutation importance and SHAP on the test split")
+args = parser.parse_args()
+
+df = load_dataset()
+X = feature_frame(df)
+y = df["is_highly_starred"]
+feature_columns = X.columns
+if args.text_features:
+    X = combine(X, load_counts(df))
+model = CatBoostClassifier(
+    loss_function="Logloss",
+    eval_metric="F1",
+    iterations=1000,
+    depth=6,
+    verbose=False,
+    thread_count=6,
+    random_state=42
+)
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.2, random_state=42, stratify=y
+)
+idf = None
+if args.text_features:
+    X_train, X_test, idf = tfidf_split(X_train, X_test, len(feature_columns))
+pos_weight = (y_train.to_numpy() == 0).sum() / (y_train.to_numpy() == 1).sum()
+param_grid_cat = {
+    "depth": [4, 6, 8, 10],
+    "learning_rate": [0.01, 0.03, 0.1],
+    "iterations": [300, 600, 1000],
+    "l2_leaf_reg": [1, 3, 5, 10],
+    "bagging_temperature": [0.0, 0.25, 0.5, 1.0],
+    "border_count": [64, 128, 254],
+    "scale_pos_weight": [1.0, pos_weight],
+}
+searches = {}
+if args.search in ("exhaustive", "compare"):
+    searches["exhaustive"] = exhaustive_search(
+        model, param_grid_cat, X_train, y_train, n_iter=50, resource="iterations", n_jobs=1
+    )
+if args.search in ("halving", "compare"):
+    # Each candidate also stops early on an eval fold carved out of its training fold
+    early_stopping = EarlyStoppingClassifier(model, early_stopping_rounds=50)
+    param_grid_es = {f"estimator__{k}": v for k, v in param_grid_cat.items()}
+    searches["halving"] = halving_search(
+        early_stopping, param_grid_es, X_train, y_train,
+        n_candidates=50, resource="estimator__iterations", max_resources=1000, min_resources=111, n_jobs=1
+    )
+if args.search == "memoized":
+    searches["memoized"] = memoized_search(
+        model, param_grid_cat, X_train, y_train, feature_columns, n_iter=50, resource="iterations", n_jobs=1
+    )
+if args.search == "compare":
+    print(search_report(searches, X_test, y_test))
+clf_cat = searches["exhaustive" if args.search == "compare" else args.search]
+best_cat = clf_cat.best_estimator_
+y_pred = best_cat.predict(X_test)
+print("CatBoost F1:", f1_score(y_test, y_pred))
+print(classification_report(y_test, y_pred))
+save_artifact(
+    getattr(best_cat, "estimator_", best_cat), "catboost", feature_columns, y.to_numpy(), df["stars"].to_numpy(),
+    metrics={"test_f1": f1_score(y_test, y_pred)},
+    idf=idf,
+)
+if args.attribute:
+    print(attribute("catboost", X_test, y_test.to_numpy(), force=True).to_string())
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from artifacts import ARTIFACT_DIR
+
+EVAL_STORE_PATH = os.path.join(ARTIFACT_DIR, "cv_evaluations.sqlite")
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+def dataset_hash(X, y) -> str:
+    """Content hash of a training matrix and its labels (dense frame or sparse CSR)"""
+    y = np.ascontiguousarray(np.asarray(y))
+    if sparse.issparse(X):
+        X = X.tocsr()
+        return _digest(X.shape, X.data.tobytes(), X.indices.tobytes(), X.indptr.tobytes(), y.tobytes())
+    values = pd.util.hash_pandas_object(pd.DataFrame(X), index=False).to_numpy()
+    return _digest(X.shape, values.tobytes(), y.tobytes())
+
+
+def feature_set_key(feature_columns, n_columns: int) -> str:
+    # n_columns also separates runs with and without the TF-IDF block
+    return _digest(",".join(feature_columns), n_columns)
+
+
+def split_key(folds) -> str:
+    return _digest(*[np.asarray(test_idx).tobytes() for _, test_idx in folds])
+
+
+def params_key(estimator) -> str:
+    """Class plus every (nested) parameter, so a changed default means a new key"""
+    params = {
+        k: (v.item() if isinstance(v, np.generic) else v)
+        for k, v in estimator.get_params(deep=True).items()
+        if not hasattr(v, "get_params")
+    }
+    return _digest(type(estimator).__name__, json.dumps(params, sort_keys=True, default=repr))
+
+
+class EvalStore:
+    """Per-fold CV scores keyed by (dataset, feature set, fold split, estimator params)"""
+    def __init__(self, path: str = EVAL_STORE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                dataset TEXT,
+                feature_set TEXT,
+                split TEXT,
+                params TEXT,
+                fold INTEGER,
+                score REAL,
+                fit_time REAL,
+                params_json TEXT,
+                created_at REAL,
+                PRIMARY KEY (dataset, feature_set, split, params, fold)
+            )
+        """)
+        self.db.commit()
+
+
+    def lookup(self, context: tuple[str, str, str], params: str) -> dict[int, tuple[float, float]]:
+        rows = self.db.execute(
+            "SELECT fold, score, fit_time FROM evaluations WHERE dataset = ? AND feature_set = ? AND split = ? AND params = ?",
+            (*context, params),
+        ).fetchall()
+        return {fold: (score, fit_time) for fold, score, fit_time in rows}
+
+
+    def record(self, context: tuple[str, str, str], params: str, fold: int, score: float, fit_time: float, params_json: str):
+        self.db.execute(
+            "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*context, params, fold, score, fit_time, params_json, time.time()),
+        )
+        self.db.commit()
+
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
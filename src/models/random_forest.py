@@ -1,3 +1,6 @@
+import argparse
+import os
+import sys
 import datetime
 from collections import Counter
 import numpy as np
@@ -6,46 +9,33 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, f1_score
 from sklearn.model_selection import RandomizedSearchCV, train_test_split
 import matplotlib.pyplot as plt
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import feature_frame, load_dataset
+from artifacts import save_artifact
+from attribution import attribute
+from text_features import combine, load_counts, tfidf_split
+from search import SEARCH_MODES, exhaustive_search, halving_search, memoized_search, search_report
 
-df = pd.read_csv("../../data/repo_data_numbers.csv")
-X = df[
-    [
-        "token_count",
-        "noun_count",
-        "verb_count",
-        "adj_count",
-        "header_count",
-        "code_block_count",
-        "inline_code_count",
-        "image_count",
-        "list_item_count",
-        "has_description",
-        "has_installation",
-        "has_usage",
-        "has_contributing",
-        "has_license",
-        "has_toc",
-        "has_credits",
-        "section_count",
-        "sentiment_polarity",
-        "sentiment_subjectivity",
-        "avg_word_length",
-        "avg_sentence_length",
-        "flesch_kincade",
-        "flesch_reading_ease",
-        "gunning_fog",
-        "dale_chall",
-        "difficult_words",
-        "completeness_score",
-        "total_sections",
-    ]
-]
+parser = argparse.ArgumentParser()
+parser.add_argument("--search", choices=SEARCH_MODES, default="exhaustive")
+parser.add_argument("--text-features", action="store_true", help="append the sparse README TF-IDF block")
+parser.add_argument("--attribute", action="store_true", help="also run permutation importance and SHAP on the test split")
+args = parser.parse_args()
+
+df = load_dataset()
+X = feature_frame(df)
 y = df["is_highly_starred"]
+feature_columns = X.columns
+if args.text_features:
+    X = combine(X, load_counts(df))
 print("Records with label 1: ", df[df["is_highly_starred"] == 1].shape[0])
 print("Records with label 0: ", df[df["is_highly_starred"] == 0].shape[0])
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42, stratify=y
 )
+idf = None
+if args.text_features:
+    X_train, X_test, idf = tfidf_split(X_train, X_test, len(feature_columns))
 param_grid = {
     "n_estimators": np.arange(100, 300, 20),
     "max_features": ["log2", "sqrt", None],
@@ -57,10 +47,24 @@ param_grid = {
 }
 before = datetime.datetime.now().astimezone()
 model = RandomForestClassifier()
-clf = RandomizedSearchCV(
-    model, param_grid, n_iter=60, cv=5, scoring="f1", random_state=42, n_jobs=6
-)
-clf.fit(X_train, y_train)
+searches = {}
+if args.search in ("exhaustive", "compare"):
+    searches["exhaustive"] = exhaustive_search(
+        model, param_grid, X_train, y_train, n_iter=60, resource="n_estimators", n_jobs=6
+    )
+if args.search in ("halving", "compare"):
+    searches["halving"] = halving_search(
+        RandomForestClassifier(random_state=42), param_grid, X_train, y_train,
+        n_candidates=60, resource="n_estimators", max_resources=280, min_resources=20, n_jobs=6
+    )
+if args.search == "memoized":
+    searches["memoized"] = memoized_search(
+        RandomForestClassifier(random_state=42), param_grid, X_train, y_train, feature_columns,
+        n_iter=60, resource="n_estimators", n_jobs=6
+    )
+if args.search == "compare":
+    print(search_report(searches, X_test, y_test))
+clf = searches["exhaustive" if args.search == "compare" else args.search]
 after = datetime.datetime.now().astimezone()
 elapsed = after - before
 print("model selection time: ", elapsed)
@@ -69,7 +73,11 @@ model = clf.best_estimator_
 y_pred = model.predict(X_test)
 f1 = f1_score(y_test, y_pred)
 importances = model.feature_importances_
-feature_names = X.columns.to_numpy()
+feature_names = feature_columns.to_numpy()
+if args.text_features:
+    # One bar for the whole TF-IDF block instead of 65k hashed terms
+    importances = np.append(importances[:len(feature_columns)], importances[len(feature_columns):].sum())
+    feature_names = np.append(feature_names, "readme_tfidf")
 feature_imp_df = pd.DataFrame(
     {"Feature": feature_names, "Gini Importance": importances}
 ).sort_values("Gini Importance", ascending=False)
@@ -82,3 +90,10 @@ plt.gca().invert_yaxis()
 plt.show()
 print("F1 Score: ", f1_score(y_test, y_pred))
 print(classification_report(y_test, y_pred))
+save_artifact(
+    model, "random_forest", feature_columns, y.to_numpy(), df["stars"].to_numpy(),
+    metrics={"test_f1": f1_score(y_test, y_pred)},
+    idf=idf,
+)
+if args.attribute:
+    print(attribute("random_forest", X_test, y_test.to_numpy(), force=True).to_string())
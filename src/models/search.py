@@ -0,0 +1,177 @@
+import json
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import f1_score
+from sklearn.model_selection import HalvingRandomSearchCV, ParameterGrid, RandomizedSearchCV, StratifiedKFold, train_test_split
+from eval_store import EvalStore, dataset_hash, feature_set_key, params_key, split_key
+
+SEARCH_MODES = ["exhaustive", "halving", "memoized", "compare"]
+
+
+class EarlyStoppingClassifier(ClassifierMixin, BaseEstimator):
+    """Wraps a CatBoost model so every fit holds out an eval fold and stops early"""
+    def __init__(self, estimator=None, eval_fraction=0.2, early_stopping_rounds=50, random_state=42):
+        self.estimator = estimator
+        self.eval_fraction = eval_fraction
+        self.early_stopping_rounds = early_stopping_rounds
+        self.random_state = random_state
+
+
+    def fit(self, X, y):
+        X_fit, X_eval, y_fit, y_eval = train_test_split(
+            X, y, test_size=self.eval_fraction, random_state=self.random_state, stratify=y
+        )
+        self.estimator_ = clone(self.estimator)
+        self.estimator_.fit(
+            X_fit, y_fit,
+            eval_set=(X_eval, y_eval),
+            early_stopping_rounds=self.early_stopping_rounds,
+            use_best_model=True,
+        )
+        self.classes_ = self.estimator_.classes_
+        self.best_iteration_ = self.estimator_.get_best_iteration()
+        return self
+
+
+    def predict(self, X):
+        return np.asarray(self.estimator_.predict(X)).ravel().astype(self.classes_.dtype)
+
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+
+
+def exhaustive_search(model, param_grid, X_train, y_train, n_iter, resource, n_jobs=1):
+    """The original RandomizedSearchCV: every candidate is fit to its full budget"""
+    search = RandomizedSearchCV(
+        model, param_grid, n_iter=n_iter, cv=5, scoring="f1", random_state=42, n_jobs=n_jobs
+    )
+    start = time.perf_counter()
+    search.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+    budgets = np.asarray(search.cv_results_[f"param_{resource}"], dtype=float)
+    search.compute_ = float(budgets.sum() * search.n_splits_)
+    search.elapsed_ = elapsed
+    return search
+
+
+def halving_search(model, param_grid, X_train, y_train, n_candidates, resource,
+                   max_resources, min_resources, factor=3, n_jobs=1):
+    """Successive halving over `resource` (n_estimators / iterations).
+
+    Candidates start at `min_resources` and only the best 1/`factor` of each
+    round are refit with `factor` times the budget, up to `max_resources`.
+    """
+    grid = {k: v for k, v in param_grid.items() if k != resource}
+    search = HalvingRandomSearchCV(
+        model,
+        grid,
+        n_candidates=n_candidates,
+        factor=factor,
+        resource=resource,
+        max_resources=max_resources,
+        min_resources=min_resources,
+        cv=5,
+        scoring="f1",
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+    start = time.perf_counter()
+    search.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+    budgets = np.asarray(search.cv_results_["n_resources"], dtype=float)
+    search.compute_ = float(budgets.sum() * search.n_splits_)
+    search.elapsed_ = elapsed
+    return search
+
+
+class MemoizedSearch:
+    """The parts of a fitted *SearchCV that search_report and the model scripts read"""
+    def __init__(self, cv_results, best_index, best_estimator, n_splits, compute, elapsed):
+        self.cv_results_ = cv_results
+        self.best_index_ = best_index
+        self.best_params_ = cv_results["params"][best_index]
+        self.best_score_ = cv_results["mean_test_score"][best_index]
+        self.best_estimator_ = best_estimator
+        self.n_splits_ = n_splits
+        self.compute_ = compute
+        self.elapsed_ = elapsed
+
+
+def _fit_fold(model, X, y, train_idx, test_idx):
+    start = time.perf_counter()
+    fitted = clone(model).fit(_take(X, train_idx), y[train_idx])
+    fit_time = time.perf_counter() - start
+    return f1_score(y[test_idx], fitted.predict(_take(X, test_idx))), fit_time
+
+
+def _take(X, idx):
+    return X.iloc[idx] if isinstance(X, pd.DataFrame) else X[idx]
+
+
+def memoized_search(model, param_grid, X_train, y_train, feature_columns, n_iter=None, resource=None,
+                    n_jobs=1, store=None):
+    """Random search whose per-fold scores persist in an EvalStore.
+
+    Candidates are a fixed shuffle of the full grid, so a rerun with a larger
+    `n_iter` sees the same first candidates and only fits the new ones.
+    `n_iter=None` evaluates the whole grid. compute_ counts only fresh fits.
+    """
+    store = EvalStore() if store is None else store
+    y = np.asarray(y_train)
+    grid = ParameterGrid(param_grid)
+    order = np.random.default_rng(42).permutation(len(grid))
+    candidates = [grid[int(i)] for i in order[:n_iter]]
+    folds = list(StratifiedKFold(n_splits=5).split(np.zeros(len(y)), y))
+    context = (dataset_hash(X_train, y), feature_set_key(feature_columns, X_train.shape[1]), split_key(folds))
+    start = time.perf_counter()
+    estimators = [clone(model).set_params(**params) for params in candidates]
+    keys = [params_key(est) for est in estimators]
+    known = [store.lookup(context, key) for key in keys]
+    todo = [(c, f) for c in range(len(candidates)) for f in range(len(folds)) if f not in known[c]]
+    print(f"Memoized search: {len(candidates) * len(folds) - len(todo)} of {len(candidates) * len(folds)} fold fits cached")
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(estimators[c], X_train, y, *folds[f]) for c, f in todo
+    )
+    compute = 0.0
+    for (c, f), (score, fit_time) in zip(todo, results):
+        params_json = json.dumps(candidates[c], sort_keys=True, default=str)
+        store.record(context, keys[c], f, score, fit_time, params_json)
+        known[c][f] = (score, fit_time)
+        compute += float(candidates[c][resource]) if resource else 1.0
+    scores = np.array([[known[c][f][0] for f in range(len(folds))] for c in range(len(candidates))])
+    fit_times = np.array([[known[c][f][1] for f in range(len(folds))] for c in range(len(candidates))])
+    cv_results = {
+        "params": candidates,
+        "mean_test_score": scores.mean(axis=1),
+        "std_test_score": scores.std(axis=1),
+        "mean_fit_time": fit_times.mean(axis=1),
+    }
+    best = int(np.argmax(cv_results["mean_test_score"]))
+    best_estimator = clone(estimators[best]).fit(X_train, y)
+    return MemoizedSearch(cv_results, best, best_estimator, len(folds), compute, time.perf_counter() - start)
+
+
+def search_report(searches: dict, X_test, y_test) -> pd.DataFrame:
+    """Side-by-side comparison of finished searches on the held-out split"""
+    rows = []
+    baseline = searches.get("exhaustive")
+    for mode, search in searches.items():
+        y_pred = search.best_estimator_.predict(X_test)
+        rows.append({
+            "mode": mode,
+            "fits": len(search.cv_results_["params"]) * search.n_splits_,
+            "compute": search.compute_,
+            "seconds": search.elapsed_,
+            "cv_f1": search.best_score_,
+            "test_f1": f1_score(y_test, y_pred),
+        })
+    report = pd.DataFrame(rows).set_index("mode")
+    if baseline is not None:
+        report["compute_fraction"] = report["compute"] / baseline.compute_
+        report["time_fraction"] = report["seconds"] / baseline.elapsed_
+    return report
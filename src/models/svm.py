@@ -1,3 +1,6 @@
+import argparse
+import os
+import sys
 import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, classification_report, f1_score
@@ -7,52 +10,45 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import GridSearchCV
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import feature_frame, load_dataset
+from feature_registry import BINARY_FEATURES
+from artifacts import save_artifact
+from attribution import attribute
+from search import memoized_search
+from text_features import combine, load_counts, tfidf_split
 
-df = pd.read_csv("../../data/repo_data_numbers.csv")
-X = df[
-    [
-        "token_count",
-        "noun_count",
-        "verb_count",
-        "adj_count",
-        "header_count",
-        "code_block_count",
-        "inline_code_count",
-        "image_count",
-        "list_item_count",
-        "has_description",
-        "has_installation",
-        "has_usage",
-        "has_contributing",
-        "has_license",
-        "has_toc",
-        "has_credits",
-        "section_count",
-        "sentiment_polarity",
-        "sentiment_subjectivity",
-        "avg_word_length",
-        "avg_sentence_length",
-        "flesch_kincade",
-        "flesch_reading_ease",
-        "gunning_fog",
-        "dale_chall",
-        "difficult_words",
-        "completeness_score",
-        "total_sections",
-    ]
-]
+parser = argparse.ArgumentParser()
+parser.add_argument("--search", choices=["exhaustive", "memoized"], default="exhaustive")
+parser.add_argument("--text-features", action="store_true", help="append the sparse README TF-IDF block")
+parser.add_argument("--attribute", action="store_true", help="also run permutation importance and SHAP on the test split")
+args = parser.parse_args()
+
+df = load_dataset()
+X = feature_frame(df)
 y = df["is_highly_starred"]
-binary_features = [
-    "has_description", "has_installation", "has_usage", "has_contributing",
-    "has_license", "has_toc", "has_credits"
-]
-numeric_features = [col for col in X.columns if col not in binary_features]
+feature_columns = X.columns
+if args.text_features:
+    X = combine(X, load_counts(df))
+binary_features = BINARY_FEATURES
+numeric_features = [col for col in feature_columns if col not in binary_features]
 preprocess = ColumnTransformer(
     transformers=[
         ("num", StandardScaler(), numeric_features),
         ("bin", "passthrough", binary_features)
     ]
 )
+if args.text_features:
+    # Columns are positional once X is sparse; centering would densify it
+    numeric_idx = [feature_columns.get_loc(c) for c in numeric_features]
+    binary_idx = [feature_columns.get_loc(c) for c in binary_features]
+    preprocess = ColumnTransformer(
+        transformers=[
+            ("num", StandardScaler(with_mean=False), numeric_idx),
+            ("bin", "passthrough", binary_idx),
+            ("text", "passthrough", slice(len(feature_columns), X.shape[1])),
+        ]
+    )
 model = Pipeline([
     ("preprocess", preprocess),
     ("svm", LinearSVC())
@@ -64,14 +60,27 @@ param_grid_svm = {
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42, stratify=y
 )
-clf_svm = GridSearchCV(
-    model,
-    param_grid=param_grid_svm,
-    cv=5,
-    scoring="f1",
-)
-clf_svm.fit(X_train, y_train)
+idf = None
+if args.text_features:
+    X_train, X_test, idf = tfidf_split(X_train, X_test, len(feature_columns))
+if args.search == "memoized":
+    clf_svm = memoized_search(model, param_grid_svm, X_train, y_train, feature_columns)
+else:
+    clf_svm = GridSearchCV(
+        model,
+        param_grid=param_grid_svm,
+        cv=5,
+        scoring="f1",
+    )
+    clf_svm.fit(X_train, y_train)
 best_svm = clf_svm.best_estimator_
 y_pred_svm = best_svm.predict(X_test)
 print("Linear SVM F1:", f1_score(y_test, y_pred_svm))
 print(classification_report(y_test, y_pred_svm))
+save_artifact(
+    best_svm, "svm", feature_columns, y.to_numpy(), df["stars"].to_numpy(),
+    metrics={"test_f1": f1_score(y_test, y_pred_svm)},
+    idf=idf,
+)
+if args.attribute:
+    print(attribute("svm", X_test, y_test.to_numpy(), force=True).to_string())
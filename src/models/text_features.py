@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+N_FEATURES = 2 ** 16
+TERMS_PATH = "../../data/readme_terms"
+
+
+def _vectorizer(n_features: int = N_FEATURES) -> HashingVectorizer:
+    # Input is already filtered, space-joined lemmas from RepoFeatureEngineer.get_tokens
+    return HashingVectorizer(
+        n_features=n_features, token_pattern=r"\S+", lowercase=False, alternate_sign=False, norm=None
+    )
+
+
+def term_counts(docs: list[str], n_features: int = N_FEATURES) -> sparse.csr_matrix:
+    """Hashed raw term counts; no document frequencies, so nothing is learned from the corpus yet"""
+    return _vectorizer(n_features).transform(docs).astype(np.float32).tocsr()
+
+
+def fit_idf(X: sparse.csr_matrix) -> np.ndarray:
+    """Smoothed idf (same as sklearn's TfidfTransformer) over the rows of a count matrix"""
+    doc_freq = np.diff(X.tocsc().indptr)
+    return (np.log((1 + X.shape[0]) / (1 + doc_freq)) + 1).astype(np.float32)
+
+
+def apply_idf(X: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+    return normalize(X @ sparse.diags(idf), norm="l2", copy=False).tocsr()
+
+
+def transform_tfidf(docs: list[str], idf: np.ndarray) -> sparse.csr_matrix:
+    return apply_idf(term_counts(docs, len(idf)), idf)
+
+
+def weigh_text(X: sparse.csr_matrix, idf: np.ndarray, n_numeric: int) -> sparse.csr_matrix:
+    """combine()d matrix with its count block turned into TF-IDF"""
+    return sparse.hstack([X[:, :n_numeric], apply_idf(X[:, n_numeric:], idf)], format="csr")
+
+
+def tfidf_split(X_train: sparse.csr_matrix, X_test: sparse.csr_matrix, n_numeric: int):
+    """Fit the idf on the training rows only, so held-out vocabulary never reaches
+    the features; the test rows are only transformed with it."""
+    idf = fit_idf(X_train[:, n_numeric:])
+    return weigh_text(X_train, idf, n_numeric), weigh_text(X_test, idf, n_numeric), idf
+
+
+def save_counts(X: sparse.csr_matrix, keys: pd.DataFrame, path: str = TERMS_PATH):
+    sparse.save_npz(f"{path}.npz", X, compressed=True)
+    keys[["owner", "name"]].to_csv(f"{path}_keys.csv", index=False)
+    print(f"Saved {X.shape[0]}x{X.shape[1]} README term-count matrix ({X.nnz} nonzeros) to {path}.npz")
+
+
+def load_counts(df: pd.DataFrame, path: str = TERMS_PATH) -> sparse.csr_matrix:
+    """Term-count rows reordered to match df's owner/name rows (all-zero rows if missing)"""
+    X = sparse.load_npz(f"{path}.npz").tocsr()
+    keys = pd.read_csv(f"{path}_keys.csv")
+    keys["row"] = np.arange(len(keys))
+    rows = df[["owner", "name"]].merge(keys.drop_duplicates(["owner", "name"]), on=["owner", "name"], how="left")["row"]
+    present = rows.notna().to_numpy()
+    out = sparse.csr_matrix((len(df), X.shape[1]), dtype=X.dtype)
+    if present.any():
+        selector = sparse.csr_matrix(
+            (np.ones(present.sum(), dtype=X.dtype), (np.flatnonzero(present), rows[present].astype(int))),
+            shape=(len(df), X.shape[0]),
+        )
+        out = selector @ X
+    return out.tocsr()
+
+
+def combine(X_numeric: pd.DataFrame, X_text: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Handcrafted features first, then the README text block, as one CSR matrix"""
+    return sparse.hstack([sparse.csr_matrix(X_numeric.to_numpy(dtype=np.float32)), X_text], format="csr")
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import KFold
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dataset import feature_matrix, load_dataset
+
+# Same grid as the percentiles we originally tested by hand
+PERCENTILES = np.linspace(0.5, 0.9, 10)
+
+
+def relabel(stars: np.ndarray, percentiles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """One `is_highly_starred` column per percentile, shape (n_repos, n_thresholds)"""
+    cutoffs = np.quantile(stars, percentiles)
+    return (stars[:, None] > cutoffs[None, :]).astype(np.int8), cutoffs
+
+
+def _fit_fold(model, X, y, train_idx, test_idx):
+    est = clone(model)
+    est.fit(X[train_idx], y[train_idx])
+    return f1_score(y[test_idx], est.predict(X[test_idx]), zero_division=0)
+
+
+def sweep(df: pd.DataFrame, percentiles=PERCENTILES, model=None, n_splits=5, n_jobs=-1) -> pd.DataFrame:
+    """Evaluate every threshold on the same feature matrix and the same CV folds"""
+    if model is None:
+        model = RandomForestClassifier(n_estimators=200, class_weight="balanced", random_state=42, n_jobs=1)
+    X = feature_matrix(df)
+    Y, cutoffs = relabel(df["stars"].to_numpy(), np.asarray(percentiles))
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=42).split(X))
+    tasks = [(t, train_idx, test_idx) for t in range(Y.shape[1]) for train_idx, test_idx in folds]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(model, X, Y[:, t], train_idx, test_idx) for t, train_idx, test_idx in tasks
+    )
+    scores = np.asarray(scores).reshape(Y.shape[1], len(folds))
+    return pd.DataFrame({
+        "percentile": percentiles,
+        "star_cutoff": cutoffs,
+        "positive_rate": Y.mean(axis=0),
+        "f1_mean": scores.mean(axis=1),
+        "f1_std": scores.std(axis=1),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="../../data/repo_data_numbers.csv")
+    parser.add_argument("--out", default="../../data/threshold_curve.csv")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+    df = load_dataset(args.data)
+    start = time.perf_counter()
+    curve = sweep(df, n_jobs=args.n_jobs)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s")
+    print(curve)
+    best = curve.loc[curve["f1_mean"].idxmax()]
+    print(f"Best threshold: p={best['percentile']:.6f} (stars > {best['star_cutoff']:.0f}), F1={best['f1_mean']:.3f}")
+    curve.to_csv(args.out, index=False)
+    print(f"Saved {args.out}")
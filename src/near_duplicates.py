@@ -0,0 +1,97 @@
+import os
+import pickle
+import re
+import zlib
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class ReadmeLSH:
+    """MinHash signatures over README word shingles, bucketed with banded LSH.
+
+    With 32 bands of 4 rows, two READMEs with Jaccard similarity s collide in
+    at least one band with probability 1 - (1 - s**4)**32 (~0.99 at s=0.8,
+    ~0.04 at s=0.3). Candidates are then confirmed against `threshold` using
+    the full signature.
+    """
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.8, shingle_size: int = 5, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**61 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2**61 - 1, size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[str]]] = [dict() for _ in range(bands)]
+        self._signatures: dict[str, np.ndarray] = {}
+
+
+    def __len__(self):
+        return len(self._signatures)
+
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = re.findall(r'\w+', text.lower())
+        k = self.shingle_size
+        grams = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))} if words else set()
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+    def signature(self, text: str) -> np.ndarray | None:
+        hv = self.shingles(text)
+        if hv.size == 0:
+            return None
+        with np.errstate(over='ignore'):
+            phv = ((hv[:, None] * self._a + self._b) % MERSENNE_PRIME) & MAX_HASH
+        return phv.min(axis=0)
+
+
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+
+    def query(self, sig: np.ndarray, repo_id: str | None = None) -> tuple[str | None, float]:
+        """Most similar indexed README at or above the threshold, if any, other than `repo_id`'s own"""
+        candidates = set()
+        for band, key in self._band_keys(sig):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(repo_id)
+        best, best_sim = None, 0.0
+        for candidate in candidates:
+            sim = float(np.mean(self._signatures[candidate] == sig))
+            if sim > best_sim:
+                best, best_sim = candidate, sim
+        if best_sim >= self.threshold:
+            return best, best_sim
+        return None, best_sim
+
+
+    def add(self, repo_id: str, sig: np.ndarray):
+        if repo_id in self._signatures:
+            return
+        self._signatures[repo_id] = sig
+        for band, key in self._band_keys(sig):
+            self._buckets[band].setdefault(key, []).append(repo_id)
+
+
+    def save(self, path: str):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp, path)
+
+
+    @classmethod
+    def load_or_create(cls, path: str, **kwargs):
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                index = pickle.load(f)
+            print(f"Loaded near-duplicate index with {len(index)} READMEs from {path}")
+            return index
+        return cls(**kwargs)
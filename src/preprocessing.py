@@ -1,14 +1,18 @@
+import hashlib
+import os
 import re
 import warnings
 from datetime import datetime
 import langdetect
-import mistune
 import numpy as np
 import pandas as pd
 import spacy
-from textblob import TextBlob
-import textstat
-from completeness import struture_completeness, html_parser
+from feature_registry import README_FEATURES, avg_sentence_length, clean_html, compute_features
+from models.text_features import save_counts, term_counts
+from quantile_sketch import KLLSketch
+from repo_db import RepoDB
+from snapshot_store import SNAPSHOT_PATH, SnapshotStore
+from summary_cube import SummaryCube
 
 OUTLIER_REPOS = [
     'Waterfox',           # 600k commits
@@ -18,6 +22,13 @@ OUTLIER_REPOS = [
     'Expensify'           # 200k commits
 ]
 
+# Long READMEs are split into pieces of about this many characters rather than truncated
+CHUNK_CHARS = 20000
+# Quantile above which a repo counts as highly starred, highly forked or active. These are
+# the original hand-picked cutoffs, including the star label's one digit shorter value;
+# models/threshold_sweep.py can re-evaluate them, but no sweep result has replaced them yet.
+LABEL_PERCENTILES = {'stars': 0.544444, 'forks': 0.5444444, 'commits_per_day': 0.5444444}
+
 warnings.filterwarnings('ignore')
 
 try:
@@ -32,11 +43,15 @@ class RepoFeatureEngineer:
         self._filter_outliers()
         self._filter_chinese_readmes()
         self.__handle_missing()
-        self.df.reset_index()
+        self.df = self.df.reset_index(drop=True)
 
 
-    def __convert_to_html(self, readme: str):
-        return mistune.html(readme)
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        """Wrap rows that are already loaded (e.g. READMEs to score) without the dataset filters"""
+        engineer = cls.__new__(cls)
+        engineer.df = df.reset_index(drop=True)
+        return engineer
 
 
     def _filter_outliers(self):
@@ -73,25 +88,24 @@ class RepoFeatureEngineer:
 
 
     def clean_html(self, html_readme: str, max_len: int | None = 100000, include_table_data: bool = False) -> str:
-        parser = html_parser()
-        parser.feed(html_readme)
-        text = " ".join(parser.heading_data + parser.text_data + (parser.table_data if include_table_data else []))
-        if max_len is not None:
-            text = text[:max_len]
-        return text
+        return clean_html(html_readme, max_len, include_table_data)
 
 
     def avg_sentence_length(self, text: str):
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 1]
-        if not sentences:
-            return 0
-        word_counts = [len(s.split()) for s in sentences]
-        return sum(word_counts) / len(word_counts)
+        return avg_sentence_length(text)
 
 
     def get_tokens(self, text: str):
-        doc = nlp(text)
+        return self._filter_tokens(nlp(text))
+
+
+    def get_tokens_batch(self, texts: list[str], batch_size: int = 64):
+        """Same as get_tokens, but streams the texts through nlp.pipe"""
+        for doc in nlp.pipe(texts, batch_size=batch_size):
+            yield self._filter_tokens(doc)
+
+
+    def _filter_tokens(self, doc):
         res = []
         for tok in doc:
             t = tok.text
@@ -101,101 +115,82 @@ class RepoFeatureEngineer:
         return res
 
 
-    def extract_readme_features(self):
-        """Extract comprehensive README quality metrics"""
-        features = []
-        total = len(self.df)
-        readmes: list[str] = self.df['readme'].tolist()
-        html_readmes: list[str] = [self.__convert_to_html(readme) for readme in readmes]
-        self.df['html_readme'] = html_readmes
-        sc = struture_completeness(html_readmes)
-        sc.compute()
-        for idx, row in self.df.iterrows():
-            if (idx + 1) % 10 == 0:
-                print(f"Processing {idx + 1}/{total}")
-            html_readme = str(row['html_readme']) if pd.notna(row['html_readme']) else ''
-            cleaned_text = self.clean_html(html_readme, include_table_data=True)
-            try:
-                tokens = self.get_tokens(cleaned_text)
-                token_count = len(tokens)
-                noun_count = sum(1 for token in tokens if token.pos_ == "NOUN")
-                verb_count = sum(1 for token in tokens if token.pos_ == "VERB")
-                adj_count = sum(1 for token in tokens if token.pos_ == "ADJ")
-            except Exception:
-                words = cleaned_text.split()
-                token_count = len(words)
-                noun_count = verb_count = adj_count = 0
-            d: dict[str, int] = sc.get_readme_completeness(html_readme)
-            header_count = d['heading_cnt']
-            code_block_count = d['code_block_cnt']
-            inline_code_count = d['inline_code_cnt']
-            image_count = d['image_cnt']
-            list_item_count = d['list_item_cnt']
-            has_description = d['description']
-            has_installation = d['installation']
-            has_usage = d['usage']
-            has_contributing = d['contribution']
-            has_license = d['license']
-            has_toc = d['table_of_contents']
-            has_credits = d['credits']
-            section_count = d['total']
-            try:
-                blob = TextBlob(cleaned_text)
-                sentiment_polarity = blob.sentiment.polarity
-                sentiment_subjectivity = blob.sentiment.subjectivity
-            except:
-                sentiment_polarity = 0
-                sentiment_subjectivity = 0
-            cleaned_text = self.clean_html(html_readme, include_table_data=False)
-            words = cleaned_text.split()
-            avg_word_length = np.mean([len(w) for w in words]) if words else 0
-            avg_sentence_length = self.avg_sentence_length(cleaned_text)
-            flesch_kincade = textstat.flesch_kincaid_grade(cleaned_text)
-            flesch_reading_ease = textstat.flesch_reading_ease(cleaned_text)
-            gunning_fog = textstat.gunning_fog(cleaned_text)
-            dale_chall = textstat.dale_chall_readability_score(cleaned_text)
-            difficult_words = textstat.difficult_words(cleaned_text)
-            completeness_indicators = [
-                has_description, has_installation, has_usage, has_contributing,
-                has_license, has_toc, has_credits
-            ]
-            total_sections = sum(completeness_indicators)
-            completeness_score = sum(completeness_indicators) / len(completeness_indicators)
-            features.append({
-                'token_count': token_count,
-                'noun_count': noun_count,
-                'verb_count': verb_count,
-                'adj_count': adj_count,
-                'header_count': header_count,
-                'code_block_count': code_block_count,
-                'inline_code_count': inline_code_count,
-                'image_count': image_count,
-                'list_item_count': list_item_count,
-                'has_description': has_description,
-                'has_installation': has_installation,
-                'has_usage': has_usage,
-                'has_contributing': has_contributing,
-                'has_license': has_license,
-                'has_toc': has_toc,
-                'has_credits': has_credits,
-                'section_count': section_count,
-                'sentiment_polarity': sentiment_polarity,
-                'sentiment_subjectivity': sentiment_subjectivity,
-                'avg_word_length': avg_word_length,
-                'avg_sentence_length': avg_sentence_length,
-                "flesch_kincade": flesch_kincade,
-                "flesch_reading_ease": flesch_reading_ease,
-                "gunning_fog": gunning_fog,
-                "dale_chall": dale_chall,
-                "difficult_words": difficult_words,
-                'completeness_score': completeness_score,
-                'total_sections': total_sections
-            })
-        return pd.DataFrame(features)
-
-
-    def extract_repo_features(self):
-        """Extract repository success metrics and temporal features"""
+    def _pos_counts(self, tokens) -> tuple[int, int, int, int]:
+        return (
+            len(tokens),
+            sum(1 for token in tokens if token.pos_ == "NOUN"),
+            sum(1 for token in tokens if token.pos_ == "VERB"),
+            sum(1 for token in tokens if token.pos_ == "ADJ"),
+        )
+
+
+    def _token_stats(self, texts: list[str], batch_size: int = 64):
+        """Provider for the registry's 'tokens' intermediate: POS counts plus lemmas, no Docs kept.
+
+        A document spaCy can't process gets None (whitespace token count, no POS
+        stats) without affecting the rest of the batch; so does every document
+        when the model isn't installed.
+        """
+        if nlp is None:
+            print("spaCy model en_core_web_sm not loaded: whitespace token counts, no POS stats or lemmas")
+            return [None] * len(texts)
+        try:
+            return [self._tokens_summary(tokens) for tokens in self.get_tokens_batch(texts, batch_size=batch_size)]
+        except ValueError:
+            # A bad document aborts the whole pipe; redo the batch one document at a time
+            return [self._doc_token_stats(text) for text in texts]
+
+
+    def _doc_token_stats(self, text: str):
+        try:
+            return self._tokens_summary(self.get_tokens(text))
+        except ValueError as e:
+            print(f"spaCy failed on a README, falling back to whitespace tokens: {e}")
+            return None
+
+
+    def _tokens_summary(self, tokens):
+        return self._pos_counts(tokens) + (" ".join(tok.lemma_.lower() for tok in tokens),)
+
+
+    def extract_readme_features(self, batch_size: int = 64, features: list[str] | None = None, chunk_chars: int | None = None):
+        """Extract README quality metrics; `features` limits the work to those registry features.
+
+        Identical READMEs (template forks, boilerplate) are hashed together and
+        processed once, then fanned back out to every row that shares them.
+        With `chunk_chars`, long READMEs are counted chunk by chunk instead of truncated.
+        """
+        # Rows passed in for scoring may have a missing or non-string README
+        readmes = self.df['readme'].fillna('').astype(str).tolist()
+        digests = pd.Series([hashlib.sha1(r.encode('utf-8')).hexdigest() for r in readmes], dtype=object)
+        codes, _ = pd.factorize(digests)
+        _, first = np.unique(codes, return_index=True)
+        unique_readmes = [readmes[i] for i in first]
+        print(f"Processing {len(unique_readmes)} unique READMEs for {len(readmes)} rows "
+              f"(dedupe ratio {1 - len(unique_readmes) / max(len(readmes), 1):.1%})")
+        computed = {}
+        result = compute_features(unique_readmes, features, chunk_chars=chunk_chars, computed=computed,
+                                  providers={'tokens': lambda texts: self._token_stats(texts, batch_size)})
+        # One (possibly chunk-joined) lemma string per unique README, fanned out like the features
+        lemmas = [s[4] if s else "" for s in computed.get('tokens', [])]
+        self.readme_lemmas = [lemmas[c] for c in codes] if lemmas else None
+        return result.iloc[codes].reset_index(drop=True)
+
+
+    def extract_repo_features(self, sketches: dict[str, KLLSketch] | None = None, growth: pd.DataFrame | None = None):
+        """Extract repository success metrics and temporal features
+
+        `sketches` maps 'stars' / 'forks' / 'commits_per_day' to streaming quantile
+        sketches built over the full corpus; labels then use the sketch cutoffs
+        instead of exact quantiles of this (possibly partial) frame.
+        `growth` (SnapshotStore.growth()) adds measured gains between the last two
+        snapshots; repos with a single snapshot get NaN there.
+        """
+        def cutoff(col):
+            if sketches and col in sketches:
+                return sketches[col].quantile(LABEL_PERCENTILES[col])
+            return df[col].quantile(LABEL_PERCENTILES[col])
+
         df = self.df.copy()
         df['created_at'] = pd.to_datetime(df['created_at']).dt.tz_localize(None)
         now = pd.Timestamp.now().tz_localize(None)
@@ -219,30 +214,54 @@ class RepoFeatureEngineer:
             df['forks_per_day'] * 0.3 +
             df['commits_per_day'] * 0.3
         )
-        df['is_highly_starred'] = (df['stars'] > df['stars'].quantile(0.544444)).astype(int)
-        df['is_highly_forked'] = (df['forks'] > df['forks'].quantile(0.5444444)).astype(int)
-        df['is_active'] = (df['commits_per_day'] > df['commits_per_day'].quantile(0.5444444)).astype(int)
-        return df[[
+        df['is_highly_starred'] = (df['stars'] > cutoff('stars')).astype(int)
+        df['is_highly_forked'] = (df['forks'] > cutoff('forks')).astype(int)
+        df['is_active'] = (df['commits_per_day'] > cutoff('commits_per_day')).astype(int)
+        features = df[[
             'repo_age_days', 'repo_age_years', 'stars_per_day', 'forks_per_day',
             'commits_per_day', 'fork_to_star_ratio', 'commits_per_contributor',
             'log_stars', 'log_forks', 'log_contributors', 'popularity_score',
             'engagement_score', 'is_highly_starred', 'is_highly_forked', 'is_active'
         ]]
+        if growth is None:
+            return features
+        measured = df[['owner', 'name']].merge(growth, on=['owner', 'name'], how='left')
+        return pd.concat([features, measured.drop(columns=['owner', 'name']).set_index(features.index)], axis=1)
+
+
+    def create_numeric_output(self, chunk_chars: int | None = CHUNK_CHARS, growth: pd.DataFrame | None = None,
+                              db: RepoDB | None = None):
+        self.save_numeric_output(self.extract_readme_features(chunk_chars=chunk_chars), growth=growth, db=db)
 
 
-    def create_numeric_output(self):
-        readme_features = self.extract_readme_features()
-        repo_features = self.extract_repo_features()
+    def save_numeric_output(self, readme_features: pd.DataFrame, out_dir: str = '.',
+                            growth: pd.DataFrame | None = None, db: RepoDB | None = None,
+                            sketches: dict[str, KLLSketch] | None = None) -> pd.DataFrame:
+        """Label repos over the whole frame (or `sketches`, see extract_repo_features) and write
+        the CSV, summary cube and README term counts"""
+        repo_features = self.extract_repo_features(sketches=sketches, growth=growth)
         result = pd.concat([
             self.df[['name', 'owner', 'language', 'stars', 'forks', 'contributors', 'commits']],
             repo_features,
             readme_features
         ], axis=1)
-        result = result.dropna()
-        result.to_csv('repo_data_numbers.csv', index=False)
+        # Growth is legitimately missing until a repo has two snapshots
+        result = result.dropna(subset=[c for c in result.columns if growth is None or c not in growth.columns])
+        result.to_csv(os.path.join(out_dir, 'repo_data_numbers.csv'), index=False)
+        SummaryCube.build(result).save(os.path.join(out_dir, 'repo_data_summary.json'))
+        if db is not None:
+            db.replace_features(result)
+        # Raw counts only: the models fit the idf on their training split
+        lemmas = getattr(self, 'readme_lemmas', None)
+        if lemmas is None:
+            print("No README lemmas (the tokens intermediate wasn't computed), skipping readme_terms")
+        else:
+            save_counts(term_counts(lemmas), self.df, os.path.join(out_dir, 'readme_terms'))
         print("Complete! Saved repo_data_numbers.csv")
+        return result
 
 
 if __name__ == "__main__":
     engineer = RepoFeatureEngineer('../data/raw_repos.csv')
-    engineer.create_numeric_output()
+    growth = SnapshotStore().growth() if os.path.isdir(SNAPSHOT_PATH) else None
+    engineer.create_numeric_output(growth=growth, db=RepoDB())
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+# GitHub search never returns more than this many results for one query
+SEARCH_RESULT_CAP = 1000
+
+
+class SearchLeaf:
+    def __init__(self, language: str, stars: tuple[int, int], created: tuple[date, date], count: int):
+        self.language = language
+        self.stars = stars
+        self.created = created
+        self.count = count
+
+
+    def query(self) -> str:
+        # created never changes, so pages stay stable while we walk them
+        return search_query(self.language, self.stars, self.created) + " sort:created-asc"
+
+
+    def __repr__(self):
+        return f"SearchLeaf({self.language}, stars {self.stars[0]}..{self.stars[1]}, created {self.created[0]}..{self.created[1]}, {self.count} repos)"
+
+
+def search_query(language: str, stars: tuple[int, int], created: tuple[date, date]) -> str:
+    return f"language:{language} stars:{stars[0]}..{stars[1]} fork:false created:{created[0].isoformat()}..{created[1].isoformat()}"
+
+
+class SearchPlanner:
+    """Splits a language x stars x created search space into ranges that each fit under the result cap.
+
+    A range whose repositoryCount is over the cap is bisected on stars first
+    (counts are heavily skewed toward low stars) and on the creation date once
+    the star range is a single value. Leaves come out in a fixed depth-first
+    order, so every repo in the space is reachable exactly once.
+    """
+    def __init__(self, count_fn, cap: int = SEARCH_RESULT_CAP):
+        self.count_fn = count_fn
+        self.cap = cap
+        self.count_requests = 0
+
+
+    def _count(self, language, stars, created) -> int:
+        self.count_requests += 1
+        return self.count_fn(search_query(language, stars, created))
+
+
+    def leaves(self, language: str, stars: tuple[int, int], created: tuple[date, date]):
+        stack = [(stars, created)]
+        while stack:
+            stars, created = stack.pop()
+            count = self._count(language, stars, created)
+            if count == 0:
+                continue
+            if count <= self.cap:
+                yield SearchLeaf(language, stars, created, count)
+                continue
+            lo, hi = stars
+            d0, d1 = created
+            if hi > lo:
+                mid = (lo + hi) // 2
+                stack.extend([((lo, mid), created), ((mid + 1, hi), created)])
+            elif d1 > d0:
+                mid = d0 + timedelta(days=(d1 - d0).days // 2)
+                stack.extend([(stars, (mid + timedelta(days=1), d1)), (stars, (d0, mid))])
+            else:
+                print(f"  ⚠️ {count} repos in {language} stars:{lo} created:{d0} can't be split; only {self.cap} reachable")
+                yield SearchLeaf(language, stars, created, count)
@@ -0,0 +1,95 @@
+import os
+from array import array
+import pandas as pd
+
+COLUMNS = ['name', 'owner', 'stars', 'forks', 'contributors', 'commits', 'language', 'created_at', 'readme']
+INT_COLUMNS = ['stars', 'forks', 'contributors', 'commits']
+TEXT_COLUMNS = ['name', 'owner', 'created_at', 'readme']
+
+
+class RepoRecordBuffer:
+    """Columnar buffer for scraped repos that spills to CSV in fixed-size blocks.
+
+    Counts live in typed arrays, languages are interned to small integer codes,
+    and text fields are UTF-8 bytes in one buffer per column addressed by an
+    offsets array, so a buffered repo costs its README bytes plus ~100 bytes.
+    """
+    def __init__(self, path: str, block_size: int = 500, resume: bool = False, db=None):
+        self.path = path
+        # Optional repo_db.RepoDB that receives every flushed block as well
+        self.db = db
+        self.block_size = block_size
+        self.flushed = 0
+        if resume and os.path.exists(path):
+            self.flushed = len(pd.read_csv(path, usecols=['name']))
+        self.language_codes: dict[str, int] = {}
+        self.languages: list[str] = []
+        self._clear()
+
+
+    def _clear(self):
+        self._ints = {c: array('q') for c in INT_COLUMNS}
+        self._language = array('H')
+        self._text = {c: bytearray() for c in TEXT_COLUMNS}
+        self._offsets = {c: array('Q', [0]) for c in TEXT_COLUMNS}
+
+
+    def __len__(self):
+        return self.flushed + self.pending()
+
+
+    def pending(self) -> int:
+        return len(self._language)
+
+
+    def append(self, record: dict) -> bool:
+        """Buffer one repo; returns True if this filled a block and it was flushed"""
+        for c in INT_COLUMNS:
+            self._ints[c].append(int(record.get(c) or 0))
+        language = record.get('language') or ''
+        if language not in self.language_codes:
+            self.language_codes[language] = len(self.languages)
+            self.languages.append(language)
+        self._language.append(self.language_codes[language])
+        for c in TEXT_COLUMNS:
+            self._text[c] += str(record.get(c) or '').encode('utf-8')
+            self._offsets[c].append(len(self._text[c]))
+        if self.pending() >= self.block_size:
+            self.flush()
+            return True
+        return False
+
+
+    def _decode(self, column: str) -> list[str]:
+        buf = self._text[column]
+        off = self._offsets[column]
+        return [buf[off[i]:off[i + 1]].decode('utf-8') for i in range(len(off) - 1)]
+
+
+    def to_frame(self) -> pd.DataFrame:
+        """The buffered (not yet flushed) block as a DataFrame"""
+        data = {c: self._decode(c) for c in TEXT_COLUMNS}
+        data.update({c: self._ints[c] for c in INT_COLUMNS})
+        data['language'] = [self.languages[code] for code in self._language]
+        return pd.DataFrame(data, columns=COLUMNS)
+
+
+    def flush(self):
+        if not self.pending():
+            return
+        # First block of a run replaces any old file, later blocks append
+        header = self.flushed == 0
+        block = self.to_frame()
+        block.to_csv(self.path, mode='w' if header else 'a', header=header, index=False, encoding='utf-8')
+        if self.db is not None:
+            self.db.upsert_raw(block)
+        self.flushed += self.pending()
+        print(f"\nFlushed {self.pending()} repositories to {self.path} ({self.flushed} total)")
+        self._clear()
+
+
+    def nbytes(self) -> int:
+        total = sum(a.itemsize * len(a) for a in self._ints.values()) + self._language.itemsize * len(self._language)
+        total += sum(len(b) for b in self._text.values())
+        total += sum(a.itemsize * len(a) for a in self._offsets.values())
+        return total
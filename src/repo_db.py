@@ -0,0 +1,165 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from record_buffer import COLUMNS as RAW_COLUMNS
+
+DB_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "repos.sqlite"))
+INDEXED_COLUMNS = ['language', 'stars', 'forks', 'contributors', 'commits', 'is_highly_starred']
+OPERATORS = ['>=', '<=', '!=', '=', '>', '<']
+
+
+class RepoDB:
+    """Embedded SQL copy of raw_repos and repo_data_numbers for ad-hoc questions.
+
+    SQLite by default; backend='duckdb' uses DuckDB's columnar engine when it
+    is installed. Filters are pushed into SQL, so only the matching rows and
+    requested columns ever reach pandas.
+    """
+    def __init__(self, path: str = DB_PATH, backend: str = 'sqlite'):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.backend = backend
+        if backend == 'duckdb':
+            import duckdb
+            self.con = duckdb.connect(path)
+        else:
+            self.con = sqlite3.connect(path)
+        raw_types = {c: 'INTEGER' if c in ('stars', 'forks', 'contributors', 'commits') else 'TEXT' for c in RAW_COLUMNS}
+        self.con.execute(
+            f"CREATE TABLE IF NOT EXISTS raw_repos ({', '.join(f'{c} {t}' for c, t in raw_types.items())}, "
+            "PRIMARY KEY (owner, name))"
+        )
+        self._index('raw_repos', ['language', 'stars'])
+        self._commit()
+
+
+    def _commit(self):
+        # DuckDB autocommits outside an explicit transaction
+        if self.backend == 'sqlite':
+            self.con.commit()
+
+
+    def _index(self, table: str, columns: list[str]):
+        for col in columns:
+            self.con.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col} ON {table} ({col})")
+
+
+    def columns(self, table: str) -> list[str]:
+        return self.query(f"SELECT * FROM {table} LIMIT 0").columns.tolist()
+
+
+    def upsert_raw(self, df: pd.DataFrame):
+        """Insert or refresh scraped repos (one RepoRecordBuffer block at a time)"""
+        rows = df[RAW_COLUMNS].astype(object).where(df[RAW_COLUMNS].notna(), None).itertuples(index=False, name=None)
+        self.con.executemany(
+            f"INSERT OR REPLACE INTO raw_repos ({', '.join(RAW_COLUMNS)}) VALUES ({', '.join('?' * len(RAW_COLUMNS))})",
+            list(rows),
+        )
+        self._commit()
+
+
+    def replace_features(self, df: pd.DataFrame):
+        """Swap in a freshly engineered repo_features table and index it"""
+        if self.backend == 'duckdb':
+            self.con.register('features_df', df)
+            self.con.execute("CREATE OR REPLACE TABLE repo_features AS SELECT * FROM features_df")
+            self.con.unregister('features_df')
+        else:
+            df.to_sql('repo_features', self.con, if_exists='replace', index=False, chunksize=5000)
+        self.con.execute("CREATE INDEX IF NOT EXISTS idx_repo_features_repo ON repo_features (owner, name)")
+        self._index('repo_features', [c for c in INDEXED_COLUMNS if c in df.columns])
+        self._commit()
+        print(f"Loaded {len(df)} rows into repo_features")
+
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        if self.backend == 'duckdb':
+            return self.con.execute(sql, list(params)).df()
+        return pd.read_sql_query(sql, self.con, params=params)
+
+
+    def select(self, table: str = 'repo_features', columns: list[str] | None = None, where: dict | None = None) -> pd.DataFrame:
+        """Rows of `table` matching `where`, e.g. {'language': 'Python', 'token_count': ('>', 500)}"""
+        declared = self.columns(table)
+        known = set(declared)
+        # Default to the table's own column order, so the frame matches the CSV it was loaded from
+        columns = columns or declared
+        unknown = [c for c in list(columns) + list(where or {}) if c not in known]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+        clauses, params = [], []
+        for col, cond in (where or {}).items():
+            op, value = cond if isinstance(cond, tuple) else ('=', cond)
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported operator {op}")
+            clauses.append(f"{col} {op} ?")
+            params.append(value.item() if isinstance(value, np.generic) else value)
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.query(sql, tuple(params))
+
+
+    def quantile(self, column: str, q: float = 0.5, table: str = 'repo_features', where: dict | None = None) -> float:
+        """Quantile of one column over the matching rows; only that column is fetched"""
+        values = self.select(table, [column], where)[column].to_numpy(dtype=float)
+        return float(np.quantile(values, q)) if len(values) else float('nan')
+
+
+def parse_where(terms: list[str]) -> dict:
+    """CLI filters like language=Python token_count>500 -> select()'s where dict"""
+    where = {}
+    for term in terms:
+        match = re.match(r"^(\w+)(>=|<=|!=|=|>|<)(.+)$", term)
+        if not match:
+            raise ValueError(f"Can't parse filter {term!r}")
+        col, op, value = match.groups()
+        try:
+            value = float(value) if '.' in value else int(value)
+        except ValueError:
+            pass
+        where[col] = (op, value)
+    return where
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ad-hoc questions over the repo database")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--backend', choices=['sqlite', 'duckdb'], default='sqlite')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sql_cmd = sub.add_parser('sql', help="run a raw SQL statement")
+    sql_cmd.add_argument('statement')
+    for name in ('median', 'count', 'rows'):
+        cmd = sub.add_parser(name)
+        if name == 'median':
+            cmd.add_argument('column')
+        if name == 'rows':
+            cmd.add_argument('--columns', nargs='+')
+        cmd.add_argument('--table', default='repo_features')
+        cmd.add_argument('where', nargs='*', help="filters such as language=Python has_installation=1 token_count>500")
+    load_cmd = sub.add_parser('load', help="(re)load tables from the CSVs")
+    load_cmd.add_argument('--raw', default='../data/raw_repos.csv')
+    load_cmd.add_argument('--features', default='../data/repo_data_numbers.csv')
+    args = parser.parse_args()
+
+    db = RepoDB(args.db, args.backend)
+    start = time.perf_counter()
+    if args.command == 'sql':
+        print(db.query(args.statement).to_string())
+    elif args.command == 'median':
+        print(f"median {args.column}: {db.quantile(args.column, 0.5, args.table, parse_where(args.where))}")
+    elif args.command == 'count':
+        print(f"{len(db.select(args.table, ['owner'], parse_where(args.where)))} rows")
+    elif args.command == 'rows':
+        print(db.select(args.table, args.columns, parse_where(args.where)).to_string())
+    else:
+        if os.path.exists(args.raw):
+            for chunk in pd.read_csv(args.raw, chunksize=5000):
+                db.upsert_raw(chunk)
+        if os.path.exists(args.features):
+            db.replace_features(pd.read_csv(args.features))
+    print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
@@ -0,0 +1,67 @@
+import argparse
+import time
+import pandas as pd
+from models.artifacts import load_artifact
+from models.text_features import combine, transform_tfidf
+from preprocessing import CHUNK_CHARS, RepoFeatureEngineer
+
+METADATA_COLUMNS = ['name', 'owner', 'language', 'stars', 'forks', 'contributors', 'commits']
+
+
+class ReadmeScorer:
+    def __init__(self, model_name: str = 'random_forest'):
+        artifact = load_artifact(model_name)
+        self.model = artifact['model']
+        self.metadata = artifact['metadata']
+        self.feature_columns = self.metadata['feature_columns']
+        self.idf = artifact.get('idf')
+
+
+    def warm(self):
+        """Run one tiny README through the whole path so the first real call isn't cold"""
+        self.score(["# Example\n\nA short example project used to warm up the scorer."])
+
+
+    def score(self, readmes, batch_size: int = 64) -> pd.DataFrame:
+        """Score a list of README strings, or a DataFrame with a `readme` column plus any repo metadata"""
+        df = readmes if isinstance(readmes, pd.DataFrame) else pd.DataFrame({'readme': list(readmes)})
+        engineer = RepoFeatureEngineer.from_dataframe(df)
+        features = engineer.extract_readme_features(batch_size=batch_size, chunk_chars=CHUNK_CHARS)
+        X = features[self.feature_columns]
+        if self.idf is not None:
+            X = combine(X, transform_tfidf(engineer.readme_lemmas, self.idf))
+        out = engineer.df[[c for c in METADATA_COLUMNS if c in engineer.df.columns]].copy()
+        if hasattr(self.model, 'predict_proba'):
+            out['probability'] = self.model.predict_proba(X)[:, 1]
+        out[self.metadata['label']] = pd.Series(self.model.predict(X).ravel()).astype(int).to_numpy()
+        return pd.concat([out, features], axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score READMEs with a saved model artifact")
+    parser.add_argument('readme', nargs='?', help="path to a README.md")
+    parser.add_argument('--batch', help="CSV with a readme column (and optional repo metadata)")
+    parser.add_argument('--model', default='random_forest', choices=['random_forest', 'svm', 'catboost'])
+    parser.add_argument('--out', help="where to write batch scores")
+    for col in METADATA_COLUMNS:
+        parser.add_argument(f'--{col}')
+    args = parser.parse_args()
+
+    scorer = ReadmeScorer(args.model)
+    scorer.warm()
+    if args.batch:
+        df = pd.read_csv(args.batch)
+    else:
+        with open(args.readme, encoding='utf-8') as f:
+            df = pd.DataFrame([{'readme': f.read(), **{c: getattr(args, c) for c in METADATA_COLUMNS if getattr(args, c) is not None}}])
+    start = time.perf_counter()
+    scores = scorer.score(df)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(scores)} README(s) in {elapsed * 1000:.1f} ms ({elapsed * 1000 / max(len(scores), 1):.1f} ms each)")
+    print(f"Model: {args.model}, success = stars > {scorer.metadata['star_cutoff']:.0f} (p={scorer.metadata['star_percentile']:.3f})")
+    if args.out:
+        scores.to_csv(args.out, index=False)
+        print(f"Saved {args.out}")
+    else:
+        cols = [c for c in ['owner', 'name', 'probability', scorer.metadata['label']] if c in scores.columns]
+        print(scores[cols].to_string(index=False))
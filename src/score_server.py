@@ -0,0 +1,194 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from score import ReadmeScorer
+
+
+class _Pending:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ScoringMetrics:
+    def __init__(self, window: int = 1000):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.readmes = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+
+
+    def record_batch(self, size: int):
+        with self.lock:
+            self.batches += 1
+            self.readmes += size
+            self.batch_sizes.append(size)
+
+
+    def record_request(self, seconds: float, ok: bool):
+        with self.lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.latencies.append(seconds * 1000)
+
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            uptime = time.time() - self.started
+            lat = np.array(self.latencies) if self.latencies else np.zeros(1)
+            return {
+                'uptime_s': round(uptime, 1),
+                'requests': self.requests,
+                'errors': self.errors,
+                'readmes_scored': self.readmes,
+                'batches': self.batches,
+                'avg_batch_size': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+                'throughput_readmes_per_s': self.readmes / uptime if uptime else 0.0,
+                'latency_ms': {
+                    'p50': float(np.percentile(lat, 50)),
+                    'p95': float(np.percentile(lat, 95)),
+                    'p99': float(np.percentile(lat, 99)),
+                },
+            }
+
+
+class MicroBatcher:
+    """Collects concurrent requests and scores them together through one nlp.pipe pass"""
+    def __init__(self, scorer: ReadmeScorer, metrics: ScoringMetrics, max_batch: int = 64, max_wait_ms: float = 10):
+        self.scorer = scorer
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: queue.Queue[_Pending] = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+
+    def submit(self, rows: list[dict]) -> list[dict]:
+        pending = _Pending(rows)
+        self.queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+
+    def _collect(self) -> list[_Pending]:
+        batch = [self.queue.get()]
+        size = len(batch[0].rows)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            size += len(pending.rows)
+        return batch
+
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for pending in batch for row in pending.rows]
+            try:
+                scores = self.scorer.score(pd.DataFrame(rows), batch_size=self.max_batch)
+                records = json.loads(scores.to_json(orient='records'))
+                self.metrics.record_batch(len(rows))
+                start = 0
+                for pending in batch:
+                    pending.result = records[start:start + len(pending.rows)]
+                    start += len(pending.rows)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            for pending in batch:
+                pending.done.set()
+
+
+def make_handler(batcher: MicroBatcher, metrics: ScoringMetrics):
+    class ScoreHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send(200, metrics.snapshot())
+            elif self.path == '/health':
+                self._send(200, {'status': 'ok', 'model': batcher.scorer.metadata['name']})
+            else:
+                self._send(404, {'error': 'not found'})
+
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._send(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                # {"readme": "...", "name": ..., ...} or {"repos": [{...}, ...]}
+                rows = body['repos'] if 'repos' in body else [body]
+                if not rows or any(not isinstance(r, dict) or 'readme' not in r for r in rows):
+                    raise ValueError("every repo needs a readme field")
+            except (ValueError, KeyError, TypeError) as e:
+                # Malformed request: bad JSON (JSONDecodeError is a ValueError), bad length or shape
+                self._send(400, {'error': str(e)})
+                metrics.record_request(time.perf_counter() - start, False)
+                return
+            try:
+                result = batcher.submit(rows)
+            except Exception as e:
+                self._send(500, {'error': str(e)})
+                metrics.record_request(time.perf_counter() - start, False)
+                return
+            self._send(200, {'scores': result})
+            metrics.record_request(time.perf_counter() - start, True)
+
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoreHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the NLP models and a trained model warm and score READMEs over HTTP")
+    parser.add_argument('--model', default='random_forest', choices=['random_forest', 'svm', 'catboost'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    scorer = ReadmeScorer(args.model)
+    scorer.warm()
+    metrics = ScoringMetrics()
+    batcher = MicroBatcher(scorer, metrics, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batcher, metrics))
+    print(f"Scoring {args.model} on http://{args.host}:{args.port} (POST /score, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
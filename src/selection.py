@@ -1,24 +1,41 @@
 import random
 import re
 import time
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import pandas as pd
 import requests
-from langdetect import LangDetectException, detect_langs
 from dotenv import load_dotenv
 import os
+from http_cache import CachedSession
+from language_id import default_backend, english_decisions
+from near_duplicates import ReadmeLSH
+from query_planner import SearchPlanner
+from record_buffer import RepoRecordBuffer
+from repo_db import RepoDB
+from snapshot_store import SNAPSHOT_COLUMNS, SnapshotStore
 
 load_dotenv()
 token = os.getenv("GITHUB_TOKEN")
 
 class GitHubScraper:
-    def __init__(self, token):
+    def __init__(self, token, readme_index_path='readme_minhash.pkl', skip_near_duplicates=True,
+                 api_url="https://api.github.com", session=None, language_id=None):
         self.token = token
-        self.endpoint = "https://api.github.com/graphql"
+        self.api_url = api_url
+        self.endpoint = f"{api_url}/graphql"
+        # Anything with requests' get/post, e.g. http_cache.CachedSession or a stub server's session
+        self.http = session or requests
+        self.language_id = language_id or default_backend()
         self.headers = {"Authorization": f"Bearer {token}"}
         self.rate_limit_remaining = 5000
         self.rate_limit_reset = None
         self.seen_repos = set()
+        self.readme_index_path = readme_index_path
+        # Replaced by the persisted index when scrape_repos resumes
+        self.readme_index = ReadmeLSH()
+        self.skip_near_duplicates = skip_near_duplicates
+        self.near_duplicates = {}
+        self.readme_downloads = 0
 
 
     def check_rate_limit(self):
@@ -30,7 +47,7 @@ class GitHubScraper:
           }
         }
         """
-        r = requests.post(self.endpoint, json={'query': query}, headers=self.headers)
+        r = self.http.post(self.endpoint, json={'query': query}, headers=self.headers)
         data = r.json()
         self.rate_limit_remaining = data['data']['rateLimit']['remaining']
         self.rate_limit_reset = data['data']['rateLimit']['resetAt']
@@ -63,40 +80,43 @@ class GitHubScraper:
 
 
     def is_english(self, text, min_prose_length=150, confidence_threshold=0.9):
-        if not text or not text.strip():
-            return False
+        return self.is_english_batch([text], min_prose_length, confidence_threshold)[0]
+
+
+    def is_english_batch(self, texts, min_prose_length=150, confidence_threshold=0.9):
+        """is_english for many READMEs with one call into the language-ID backend"""
+        res = [False] * len(texts)
+        proses = {}
         cjk_pattern = re.compile(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff\uac00-\ud7af]+')
-        cjk_chars = len(cjk_pattern.findall(text))
-        if cjk_chars > 20:
-            print(f"    Rejected: Contains {cjk_chars} CJK characters")
-            return False
-        prose = self.extract_prose_only(text)
-        if len(prose) < min_prose_length:
-            print(f"    Rejected: Insufficient prose ({len(prose)} chars)")
-            return False
-        try:
-            detected = detect_langs(prose)
-            en_prob = 0.0
-            lang = detected[0].lang
-            for lp in detected:
-                if lp.lang == "en":
-                    en_prob = lp.prob
-            if lang != "en" or en_prob < confidence_threshold:
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cjk_chars = len(cjk_pattern.findall(text))
+            if cjk_chars > 20:
+                print(f"    Rejected: Contains {cjk_chars} CJK characters")
+                continue
+            prose = self.extract_prose_only(text)
+            if len(prose) < min_prose_length:
+                print(f"    Rejected: Insufficient prose ({len(prose)} chars)")
+                continue
+            proses[i] = prose
+        decisions = english_decisions(self.language_id, list(proses.values()), confidence_threshold)
+        for i, (english, lang, en_prob) in zip(proses, decisions):
+            if lang is None:
+                print("    Rejected: Language detection failed")
+            elif not english:
                 print(f"    Rejected: Language={lang}, EN confidence={en_prob:.2f}")
-                return False
-            return True
-        except LangDetectException:
-            print("    Rejected: Language detection failed")
-            return False
+            res[i] = english
+        return res
 
 
     def get_contributor_count(self, owner, name, max_retries=3):
         """Fetch actual contributor count via REST API"""
-        url = f"https://api.github.com/repos/{owner}/{name}/contributors"
+        url = f"{self.api_url}/repos/{owner}/{name}/contributors"
         params = {"per_page": 1, "anon": "true"}
         for attempt in range(max_retries):
             try:
-                r = requests.get(url, headers=self.headers, params=params, timeout=10)
+                r = self.http.get(url, headers=self.headers, params=params, timeout=10)
                 if r.status_code == 200:
                     link_header = r.headers.get('Link', '')
                     if 'rel="last"' in link_header:
@@ -121,10 +141,30 @@ class GitHubScraper:
         return 0
 
 
-    def fetch_repositories(self, language, stars_range, cursor=None, year_range=None, max_retries=5):
+    def count_repositories(self, search_query, max_retries=5):
+        """repositoryCount for a search query, without fetching any nodes"""
+        query = """
+        query($query: String!) {
+          search(query: $query, type: REPOSITORY, first: 1) {
+            repositoryCount
+          }
+          rateLimit {
+            remaining
+            resetAt
+          }
+        }
+        """
+        result = self.graphql(query, {"query": search_query}, max_retries)
+        if result is None:
+            # Returning 0 would make the planner drop the whole range as empty
+            raise RuntimeError(f"repositoryCount failed after {max_retries} attempts for {search_query!r}")
+        return result['search']['repositoryCount']
+
+
+    def fetch_repositories(self, language=None, stars_range=None, cursor=None, year_range=None, max_retries=5, search_query=None, first=10, include_readme=True):
         query = """
-        query($query: String!, $cursor: String) {
-          search(query: $query, type: REPOSITORY, first: 10, after: $cursor) {
+        query($query: String!, $cursor: String, $first: Int!, $withReadme: Boolean!) {
+          search(query: $query, type: REPOSITORY, first: $first, after: $cursor) {
             pageInfo {
               hasNextPage
               endCursor
@@ -145,7 +185,7 @@ class GitHubScraper:
                     }
                   }
                 }
-                object(expression: "HEAD:README.md") {
+                object(expression: "HEAD:README.md") @include(if: $withReadme) {
                   ... on Blob { text }
                 }
               }
@@ -157,13 +197,139 @@ class GitHubScraper:
           }
         }
         """
-        search_query = f"language:{language} stars:{stars_range} fork:false sort:updated"
-        if year_range:
-            search_query += f" created:{year_range}"
-        variables = {"query": search_query, "cursor": cursor}
+        if search_query is None:
+            search_query = f"language:{language} stars:{stars_range} fork:false sort:updated"
+            if year_range:
+                search_query += f" created:{year_range}"
+        variables = {"query": search_query, "cursor": cursor, "first": first, "withReadme": include_readme}
+        result = self.graphql(query, variables, max_retries)
+        return result['search'] if result else None
+
+
+    def fetch_readmes(self, repo_ids, batch_size=25, max_retries=5):
+        """README text for many owner/name ids, `batch_size` repositories per aliased GraphQL query.
+
+        With a blob cache under the scraper (http_cache.CachedSession), each batch
+        first asks only for the README blob oids and downloads just the texts not
+        cached under that oid, i.e. new or edited READMEs.
+        Ids whose README couldn't be fetched are left out of the result rather
+        than given an empty README, so callers can tell them from repos without one.
+        """
+        blobs = self.http if hasattr(self.http, 'blob') else None
+        readmes = {}
+        for start in range(0, len(repo_ids), batch_size):
+            batch = repo_ids[start:start + batch_size]
+            if blobs is None:
+                found = self._fetch_readme_batch(batch, 'text', max_retries)
+                self.readme_downloads += len(found)
+                readmes.update({repo_id: blob.get('text') or '' for repo_id, blob in found.items()})
+                continue
+            missing = []
+            for repo_id, blob in self._fetch_readme_batch(batch, 'oid', max_retries).items():
+                text = blobs.blob(blob['oid']) if blob.get('oid') else ''
+                if text is None:
+                    missing.append(repo_id)
+                else:
+                    readmes[repo_id] = text
+            for repo_id, blob in self._fetch_readme_batch(missing, 'oid text', max_retries).items():
+                if blob.get('oid'):
+                    blobs.store_blob(blob['oid'], blob.get('text') or '')
+                readmes[repo_id] = blob.get('text') or ''
+                self.readme_downloads += 1
+        return readmes
+
+
+    def _fetch_readme_batch(self, batch, fields='text', max_retries=5):
+        """{repo_id: README blob with `fields`} ({} when there is no README) for one aliased query"""
+        if not batch:
+            return {}
+        params = []
+        selections = []
+        variables = {}
+        for i, repo_id in enumerate(batch):
+            owner, name = repo_id.split('/', 1)
+            params.append(f"$o{i}: String!, $n{i}: String!")
+            selections.append(f"""
+              r{i}: repository(owner: $o{i}, name: $n{i}) {{
+                object(expression: "HEAD:README.md") {{
+                  ... on Blob {{ {fields} }}
+                }}
+              }}""")
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+        query = f"""
+            query({", ".join(params)}) {{{"".join(selections)}
+              rateLimit {{
+                remaining
+                resetAt
+              }}
+            }}
+            """
+        result = self.graphql(query, variables, max_retries)
+        if result is None:
+            if len(batch) == 1:
+                print(f"  ✗ README fetch failed: {batch[0]}")
+                return {}
+            # One deleted or broken repo fails the whole query; retry in halves to isolate it
+            print(f"  README batch of {len(batch)} failed, retrying in halves")
+            half = len(batch) // 2
+            return {**self._fetch_readme_batch(batch[:half], fields, min(max_retries, 2)),
+                    **self._fetch_readme_batch(batch[half:], fields, min(max_retries, 2))}
+        return {repo_id: (result.get(f"r{i}") or {}).get('object') or {} for i, repo_id in enumerate(batch)}
+
+
+    def refresh_metadata(self, repo_ids, batch_size=50, max_retries=5):
+        """Current stars/forks/commits for already-scraped owner/name ids, without README blobs.
+
+        Contributors need one REST call per repo, so a refresh leaves them out.
+        """
+        rows = []
+        for start in range(0, len(repo_ids), batch_size):
+            batch = repo_ids[start:start + batch_size]
+            params = []
+            fields = []
+            variables = {}
+            for i, repo_id in enumerate(batch):
+                owner, name = repo_id.split('/', 1)
+                params.append(f"$o{i}: String!, $n{i}: String!")
+                fields.append(f"""
+              r{i}: repository(owner: $o{i}, name: $n{i}) {{
+                stargazerCount
+                forkCount
+                defaultBranchRef {{
+                  target {{
+                    ... on Commit {{ history {{ totalCount }} }}
+                  }}
+                }}
+              }}""")
+                variables[f"o{i}"] = owner
+                variables[f"n{i}"] = name
+            query = f"""
+            query({", ".join(params)}) {{{"".join(fields)}
+              rateLimit {{
+                remaining
+                resetAt
+              }}
+            }}
+            """
+            result = self.graphql(query, variables, max_retries) or {}
+            for i, repo_id in enumerate(batch):
+                repo = result.get(f"r{i}")
+                # Deleted, renamed or made private since the last run
+                if not repo:
+                    continue
+                owner, name = repo_id.split('/', 1)
+                commits = ((repo.get('defaultBranchRef') or {}).get('target') or {}).get('history', {}).get('totalCount')
+                rows.append({'owner': owner, 'name': name, 'stars': repo.get('stargazerCount'),
+                             'forks': repo.get('forkCount'), 'commits': commits})
+            print(f"Refreshed {len(rows)}/{start + len(batch)} repos")
+        return pd.DataFrame(rows, columns=['owner', 'name', 'stars', 'forks', 'commits'])
+
+
+    def graphql(self, query, variables, max_retries=5):
         for attempt in range(max_retries):
             try:
-                r = requests.post(
+                r = self.http.post(
                     self.endpoint,
                     json={'query': query, 'variables': variables},
                     headers=self.headers,
@@ -181,7 +347,7 @@ class GitHubScraper:
                             self.exponential_backoff(attempt)
                             continue
                         return None
-                    return data['data']['search']
+                    return data['data']
                 if r.status_code in (403, 429):
                     print(f"Rate limited. Status {r.status_code}")
                     if attempt < max_retries - 1:
@@ -210,7 +376,8 @@ class GitHubScraper:
                       .get('totalCount', 0)
         owner = node['owner'].get('login', '')
         name = node.get('name', '')
-        contributors = self.get_contributor_count(owner, name)
+        # The two-phase fetch already looked contributors up before downloading the README
+        contributors = node['contributors'] if 'contributors' in node else self.get_contributor_count(owner, name)
         return {
             'name': name,
             'owner': owner,
@@ -221,10 +388,20 @@ class GitHubScraper:
             'language': node.get('primaryLanguage', {}).get('name', ''),
             'created_at': node.get('createdAt', ''),
             'is_fork': node.get('isFork', False),
+            'is_english': node.get('is_english'),
             'readme': readme
         }
 
 
+    def find_near_duplicate(self, readme, repo_id=None):
+        """MinHash the README and look it up among already accepted ones (other than repo_id itself)"""
+        sig = self.readme_index.signature(readme) if readme else None
+        if sig is None:
+            return None, None, 0.0
+        dup_of, sim = self.readme_index.query(sig, repo_id)
+        return sig, dup_of, sim
+
+
     def is_valid_repo(self, r):
         if r['is_fork']:
             return False
@@ -232,132 +409,202 @@ class GitHubScraper:
             return False
         if not r['readme'].strip():
             return False
-        if not self.is_english(r['readme']):
+        english = r.get('is_english')
+        if not (self.is_english(r['readme']) if english is None else english):
             return False
         return True
 
 
-    def scrape_repos(self, target_count=10000):
+    def accept_node(self, node, all_repos, output_path):
+        """Run one search hit through dedupe and validation; returns True if it was added"""
+        repo_id = f"{node['owner']['login']}/{node['name']}"
+        if repo_id in self.seen_repos:
+            print(f"  ⊘ Duplicate: {repo_id}")
+            return False
+        self.seen_repos.add(repo_id)
+        return self.accept_new_node(node, repo_id, all_repos, output_path)
+
+
+    def metadata_pass(self, nodes):
+        """First phase of the two-phase fetch: drop duplicates, forks and single-contributor repos
+        using metadata only, then download READMEs for the survivors in batched queries"""
+        keep = {}
+        for node in nodes:
+            repo_id = f"{node['owner']['login']}/{node['name']}"
+            if repo_id in self.seen_repos:
+                print(f"  ⊘ Duplicate: {repo_id}")
+                continue
+            self.seen_repos.add(repo_id)
+            if node.get('isFork'):
+                print(f"  ✗ Filtered out (fork): {repo_id}")
+                continue
+            node['contributors'] = self.get_contributor_count(node['owner']['login'], node['name'])
+            if node['contributors'] <= 1:
+                print(f"  ✗ Filtered out ({node['contributors']} contributors): {repo_id}")
+                continue
+            keep[repo_id] = node
+        readmes = self.fetch_readmes(list(keep))
+        for repo_id in [r for r in keep if r not in readmes]:
+            # Not evaluated, so a later page or run can still pick it up
+            print(f"  ⊘ Skipped (README unavailable): {repo_id}")
+            self.seen_repos.discard(repo_id)
+            del keep[repo_id]
+        english = self.is_english_batch([readmes[repo_id] for repo_id in keep])
+        for (repo_id, node), is_en in zip(keep.items(), english):
+            node['object'] = {'text': readmes[repo_id]}
+            node['is_english'] = is_en
+        return keep
+
+
+    def language_pass(self, nodes):
+        """Single-phase counterpart of metadata_pass's language check: one is_english_batch call per page"""
+        fresh = [node for node in nodes
+                 if f"{node['owner']['login']}/{node['name']}" not in self.seen_repos and not node.get('isFork')]
+        readmes = [(node.get('object') or {}).get('text') or '' for node in fresh]
+        for node, is_en in zip(fresh, self.is_english_batch(readmes)):
+            node['is_english'] = is_en
+
+
+    def accept_new_node(self, node, repo_id, all_repos, output_path):
+        readme = node['object'].get('text', '') if node.get('object') else ''
+        sig, dup_of, sim = self.find_near_duplicate(readme, repo_id)
+        if dup_of:
+            print(f"  ≈ Near-duplicate of {dup_of} (J≈{sim:.2f}): {repo_id}")
+            self.near_duplicates[repo_id] = dup_of
+            if self.skip_near_duplicates:
+                return False
+        data = self.parse_repo_data(node)
+        if not self.is_valid_repo(data):
+            print(f"  ✗ Filtered out: {data['owner']}/{data['name']}")
+            return False
+        if sig is not None:
+            self.readme_index.add(repo_id, sig)
+        if all_repos.append(data):
+            self.save_state(output_path)
+        print(f"  ✓ Added: {repo_id} ({len(all_repos)})")
+        return True
+
+
+    def scrape_repos(self, target_count=10000, output_path='raw_repos.csv', resume=False,
+                     created=(date(2015, 1, 1), date(2025, 12, 31)), page_size=100, two_phase=False,
+                     snapshots: SnapshotStore | None = None, db: RepoDB | None = None):
         languages = [
             'JavaScript', 'Python', 'Java', 'TypeScript', 'C#',
             'C++', 'PHP', 'Shell', 'C', 'Ruby'
         ]
-        star_ranges = [
-            '3500..5000',
-            '3000..3500',
-            '2500..3000',
-            '2000..2500',
-            '1500..2000',
-            '1000..1500',
-            '500..1000',
-            '100..500',
-            '50..100',
-            '5..50'
-        ]
-        year_ranges = [
-            '2024-01-01..2025-12-31',
-            '2023-01-01..2023-12-31',
-            '2022-01-01..2022-12-31',
-            '2021-01-01..2021-12-31',
-            '2020-01-01..2020-12-31',
-            '2019-01-01..2019-12-31',
-            '2018-01-01..2018-12-31',
-            '2017-01-01..2017-12-31',
-            '2016-01-01..2016-12-31',
-            '2015-01-01..2015-12-31'
+        star_bands = [
+            (3501, 5000),
+            (3001, 3500),
+            (2501, 3000),
+            (2001, 2500),
+            (1501, 2000),
+            (1001, 1500),
+            (501, 1000),
+            (101, 500),
+            (51, 100),
+            (5, 50),
         ]
-        all_repos = []
+        all_repos = RepoRecordBuffer(output_path, block_size=500, resume=resume, db=db)
+        # Rows already in the CSV were snapshotted by the run that scraped them
+        resumed_rows = len(all_repos)
+        if resume and self.readme_index_path:
+            self.readme_index = ReadmeLSH.load_or_create(self.readme_index_path)
+        if resume and len(all_repos):
+            prev = pd.read_csv(output_path, usecols=['owner', 'name'])
+            self.seen_repos.update(prev['owner'] + '/' + prev['name'])
+            print(f"Resuming with {len(all_repos)} repositories already in {output_path}")
         print(f"Starting scrape for {target_count} repositories...\n")
         self.check_rate_limit()
-        stuck_counter = 0
-        last_count = 0
-        while len(all_repos) < target_count:
-            if len(all_repos) == last_count:
-                stuck_counter += 1
-                if stuck_counter >= 3:
-                    print(f"\n⚠️ Stuck at {len(all_repos)} repos for 3 iterations.")
-                    print("Expanding search to lower star ranges...")
-                    if '1..5' not in star_ranges:
-                        star_ranges.extend(['1..5', '0..1'])
-                    stuck_counter = 0
-            else:
-                stuck_counter = 0
-            last_count = len(all_repos)
-            random.shuffle(languages)
-            random.shuffle(star_ranges)
-            random.shuffle(year_ranges)
-            for language in languages:
-                if len(all_repos) >= target_count:
-                    break
-                for star_range in star_ranges:
-                    if len(all_repos) >= target_count:
+        planner = SearchPlanner(self.count_repositories)
+        # One lazy leaf stream per (language, star band); taking one leaf from each in
+        # turn keeps the old even spread over languages and bands, but deterministic
+        streams = [planner.leaves(language, band, created) for band in star_bands for language in languages]
+        pages_fetched = 0
+        search_hits = 0
+        # Only reached when the bands above run dry, like the old stuck-search fallback
+        fallback_bands = [(1, 4), (0, 0)]
+        try:
+            while len(all_repos) < target_count:
+                if not streams:
+                    if not fallback_bands:
                         break
-                    year_range = random.choice(year_ranges)
+                    print("\nExpanding search to lower star ranges...")
+                    streams = [planner.leaves(language, band, created) for band in fallback_bands for language in languages]
+                    fallback_bands = []
+                for stream in list(streams):
+                    leaf = next(stream, None)
+                    if leaf is None:
+                        streams.remove(stream)
+                        continue
+                    print(f"\n→ {leaf}")
                     cursor = None
-                    pages = 0
-                    max_pages = 20
-                    found_new_in_query = False
-                    while pages < max_pages and len(all_repos) < target_count:
+                    while len(all_repos) < target_count:
                         if self.rate_limit_remaining < 100:
                             print("Rate limit low, waiting...")
                             time.sleep(60)
                             self.check_rate_limit()
-                        result = self.fetch_repositories(language, star_range, cursor, year_range)
+                        result = self.fetch_repositories(
+                            search_query=leaf.query(), cursor=cursor, first=page_size, include_readme=not two_phase
+                        )
+                        pages_fetched += 1
                         if not result or not result.get('nodes'):
                             break
-                        for node in result['nodes']:
-                            if not node:
-                                continue
-                            repo_id = f"{node['owner']['login']}/{node['name']}"
-                            if repo_id in self.seen_repos:
-                                print(f"  ⊘ Duplicate: {repo_id}")
-                                continue
-                            self.seen_repos.add(repo_id)
-                            data = self.parse_repo_data(node)
-                            if self.is_valid_repo(data):
-                                all_repos.append(data)
-                                found_new_in_query = True
-                                print(f"  ✓ Added: {data['owner']}/{data['name']} ({len(all_repos)}/{target_count})")
-                                if len(all_repos) >= target_count:
-                                    print(f"\n🎉 Reached target: {target_count} valid repos collected!")
-                                    random.shuffle(all_repos)
-                                    return all_repos
-                            else:
-                                print(f"  ✗ Filtered out: {data['owner']}/{data['name']}")
-                        if len(all_repos) > 0 and len(all_repos) % 500 == 0:
-                            self.save_to_csv(all_repos, f'github_repos_intermediate_{len(all_repos)}.csv')
+                        nodes = [node for node in result['nodes'] if node]
+                        search_hits += len(nodes)
+                        if two_phase:
+                            candidates = self.metadata_pass(nodes)
+                            accepted = (self.accept_new_node(node, repo_id, all_repos, output_path) for repo_id, node in candidates.items())
+                        else:
+                            self.readme_downloads += len(nodes)
+                            self.language_pass(nodes)
+                            accepted = (self.accept_node(node, all_repos, output_path) for node in nodes)
+                        for added in accepted:
+                            if added and len(all_repos) >= target_count:
+                                break
                         info = result.get('pageInfo', {})
                         if not info.get('hasNextPage'):
                             break
                         cursor = info.get('endCursor')
-                        pages += 1
-                    if not found_new_in_query and pages > 5:
-                        print("  → No new repos in this combo, moving on...")
+                    if len(all_repos) >= target_count:
+                        print(f"\n🎉 Reached target: {target_count} valid repos collected!")
                         break
-            if len(all_repos) < target_count and stuck_counter == 0:
-                print(f"\nCompleted search cycle. Collected {len(all_repos)}/{target_count}")
-                if len(all_repos) < target_count * 0.7:
-                    print("⚠️ May not reach target with current filters. Consider:")
-                    print("  - Lowering min_prose_length")
-                    print("  - Reducing confidence_threshold")
-                    print("  - Accepting single-contributor repos")
-        random.shuffle(all_repos)
+        finally:
+            # Also on a failed count query, so a resumed run keeps everything accepted so far
+            all_repos.flush()
+            self.save_state(output_path)
+        if len(all_repos) < target_count:
+            print(f"\n⚠️ Search space exhausted at {len(all_repos)}/{target_count}. Consider:")
+            print("  - Lowering min_prose_length")
+            print("  - Reducing confidence_threshold")
+            print("  - Accepting single-contributor repos")
+        print(f"Requests: {planner.count_requests} count queries, {pages_fetched} pages for {len(all_repos)} repos")
+        print(f"README blobs downloaded: {self.readme_downloads} for {search_hits} search hits")
+        if snapshots is not None and len(all_repos) > resumed_rows:
+            snapshots.append(pd.read_csv(output_path, usecols=['owner', 'name'] + SNAPSHOT_COLUMNS,
+                                         dtype={'owner': str, 'name': str}, skiprows=range(1, resumed_rows + 1)))
         return all_repos
 
 
+    def save_state(self, filename):
+        """Persist the near-duplicate index so a run can resume"""
+        if self.readme_index_path:
+            self.readme_index.save(self.readme_index_path)
+
+
     def save_to_csv(self, repos, filename='raw_repos.csv'):
         df = pd.DataFrame(repos)
         if 'is_fork' in df.columns:
             df = df.drop(columns=['is_fork'])
         df.to_csv(filename, index=False, encoding='utf-8')
+        self.save_state(filename)
         print(f"\nSaved {len(repos)} repositories to {filename}")
         return df
 
 
     def test_language_detection(self, sample_size=50):
         print("Testing language detection...")
-        repos = self.scrape_repos(target_count=sample_size, repos_per_language=5)
-        for r in repos:
+        repos = self.scrape_repos(target_count=sample_size, output_path='language_detection_sample.csv')
+        for _, r in pd.read_csv(repos.path).iterrows():
             print(f"\n{r['owner']}/{r['name']}")
             prose = self.extract_prose_only(r['readme'])
             print(f"Prose length: {len(prose)}")
@@ -365,7 +612,8 @@ class GitHubScraper:
 
 
 if __name__ == "__main__":
-    scraper = GitHubScraper(token)
-    repos = scraper.scrape_repos(target_count=10000)
-    df = scraper.save_to_csv(repos, 'raw_repos.csv')
-    print(f"\n✅ Final count: {len(df)} repositories")
+    scraper = GitHubScraper(token, session=CachedSession('http_cache.sqlite'))
+    repos = scraper.scrape_repos(target_count=10000, output_path='raw_repos.csv', two_phase=True,
+                                 snapshots=SnapshotStore(), db=RepoDB())
+    print(scraper.http.report())
+    print(f"\n✅ Final count: {len(repos)} repositories")
@@ -0,0 +1,281 @@
+import argparse
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from multiprocessing import Process
+import pandas as pd
+from feature_registry import README_FEATURES
+from preprocessing import CHUNK_CHARS, LABEL_PERCENTILES, RepoFeatureEngineer
+from quantile_sketch import KLLSketch
+
+# Raw columns a worker needs; labels are left to the merge, where every shard is visible
+RAW_COLUMNS = ['name', 'owner', 'language', 'stars', 'forks', 'contributors', 'commits', 'created_at', 'readme']
+TEXT_COLUMNS = {'name': str, 'owner': str, 'language': str, 'created_at': str, 'readme': str}
+# Columns the success labels cut at a percentile; each shard ships a sketch of them
+LABEL_COLUMNS = list(LABEL_PERCENTILES)
+STALE_AFTER = 30 * 60
+
+
+class ShardQueue:
+    """File-based work queue over a shared directory.
+
+    `plan` writes the filtered raw rows as content-addressed shards plus a
+    manifest fixing their order. Workers claim a shard by creating
+    claims/<id>.lock with O_EXCL, keep its mtime fresh while they work, and
+    publish outputs/<id>.csv with an atomic rename, after a KLL sketch of the
+    shard's label columns (outputs/<id>.sketch.json). A lock whose mtime is older
+    than `stale_after` belongs to a dead worker and is taken over. The lock names
+    its worker, so a stalled worker that comes back stops heartbeating and
+    leaves the new owner's lock in place.
+    """
+    def __init__(self, work_dir: str, stale_after: float = STALE_AFTER):
+        self.work_dir = work_dir
+        self.stale_after = stale_after
+        self.shard_dir = os.path.join(work_dir, 'shards')
+        self.claim_dir = os.path.join(work_dir, 'claims')
+        self.output_dir = os.path.join(work_dir, 'outputs')
+        self.manifest_path = os.path.join(work_dir, 'manifest.json')
+
+
+    def plan(self, raw_csv: str, shard_size: int = 500) -> list[str]:
+        for d in (self.shard_dir, self.claim_dir, self.output_dir):
+            os.makedirs(d, exist_ok=True)
+        df = RepoFeatureEngineer(raw_csv).df[RAW_COLUMNS]
+        shard_ids = []
+        for start in range(0, len(df), shard_size):
+            payload = df.iloc[start:start + shard_size].to_csv(index=False).encode('utf-8')
+            shard_id = hashlib.sha1(payload).hexdigest()[:16]
+            path = self.shard_path(shard_id)
+            # Same rows, same id: re-planning an unchanged corpus reuses finished outputs
+            if not os.path.exists(path):
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(payload)
+                os.replace(path + '.tmp', path)
+            shard_ids.append(shard_id)
+        with open(self.manifest_path + '.tmp', 'w') as f:
+            json.dump({'raw_csv': raw_csv, 'shard_size': shard_size, 'shards': shard_ids}, f, indent=2)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+        print(f"Planned {len(shard_ids)} shards of up to {shard_size} repos in {self.work_dir}")
+        return shard_ids
+
+
+    def shards(self) -> list[str]:
+        with open(self.manifest_path) as f:
+            return json.load(f)['shards']
+
+
+    def shard_path(self, shard_id: str) -> str:
+        return os.path.join(self.shard_dir, f"{shard_id}.csv")
+
+
+    def output_path(self, shard_id: str) -> str:
+        return os.path.join(self.output_dir, f"{shard_id}.csv")
+
+
+    def sketch_path(self, shard_id: str) -> str:
+        return os.path.join(self.output_dir, f"{shard_id}.sketch.json")
+
+
+    def lock_path(self, shard_id: str) -> str:
+        return os.path.join(self.claim_dir, f"{shard_id}.lock")
+
+
+    def claim(self, shard_id: str, worker: str) -> bool:
+        """Atomically take a shard; a stale lock is moved aside under a unique name so only one worker wins it"""
+        path = self.lock_path(shard_id)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except FileNotFoundError:
+            age = None
+        if age is not None:
+            if age < self.stale_after:
+                return False
+            seen = self._lock_info(path)
+            # Only one rename of this lock succeeds; whoever gets it deletes the stale lock and
+            # then races for a fresh one like any other claimant
+            stale = f"{path}.stale-{uuid.uuid4().hex}"
+            try:
+                os.rename(path, stale)
+            except FileNotFoundError:
+                return False
+            if self._lock_info(stale) != seen:
+                # Another worker recovered it and re-claimed between our stat and rename: put its
+                # lock back with link(), which fails instead of overwriting a newer one
+                try:
+                    os.link(stale, path)
+                except FileExistsError:
+                    pass
+                os.remove(stale)
+                return False
+            os.remove(stale)
+            print(f"[{worker}] Recovered stale claim on {shard_id} ({age:.0f}s old)")
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'worker': worker, 'host': socket.gethostname(), 'pid': os.getpid(), 'claimed_at': time.time()}, f)
+        return True
+
+
+    def _lock_info(self, path: str) -> dict | None:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+    def owner(self, shard_id: str) -> str | None:
+        """Worker named in the shard's lock, or None if it is unclaimed"""
+        info = self._lock_info(self.lock_path(shard_id))
+        return info.get('worker') if info else None
+
+
+    def release(self, shard_id: str, worker: str) -> bool:
+        """Drop `worker`'s lock; a lock another worker has since taken over is left alone"""
+        if self.owner(shard_id) != worker:
+            print(f"[{worker}] Lost the claim on {shard_id} to {self.owner(shard_id)}; leaving its lock")
+            return False
+        try:
+            os.remove(self.lock_path(shard_id))
+        except FileNotFoundError:
+            pass
+        return True
+
+
+    def _heartbeat(self, shard_id: str, worker: str, stop: threading.Event):
+        while not stop.wait(self.stale_after / 4):
+            # A worker that stalled past stale_after may have been replaced; stop touching its lock
+            if self.owner(shard_id) != worker:
+                print(f"[{worker}] Claim on {shard_id} was taken over, heartbeat stopped")
+                return
+            try:
+                os.utime(self.lock_path(shard_id))
+            except FileNotFoundError:
+                return
+
+
+    def process(self, shard_id: str, batch_size: int = 64, chunk_chars: int | None = CHUNK_CHARS):
+        raw = pd.read_csv(self.shard_path(shard_id), dtype=TEXT_COLUMNS).fillna({'readme': ''})
+        engineer = RepoFeatureEngineer.from_dataframe(raw)
+        features = engineer.extract_readme_features(batch_size=batch_size, chunk_chars=chunk_chars)
+        out = pd.concat([raw.drop(columns=['readme']), features], axis=1)
+        out['lemmas'] = engineer.readme_lemmas or [''] * len(out)
+        rates = engineer.extract_repo_features()
+        sketches = {col: KLLSketch() for col in LABEL_COLUMNS}
+        for col, sketch in sketches.items():
+            sketch.update_many((rates if col in rates.columns else raw)[col])
+        # Written before the CSV, whose appearance marks the shard finished
+        tmp = f"{self.sketch_path(shard_id)}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({col: sketch.to_dict() for col, sketch in sketches.items()}, f)
+        os.replace(tmp, self.sketch_path(shard_id))
+        path = self.output_path(shard_id)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        out.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+
+
+    def work(self, worker: str | None = None, **kwargs) -> int:
+        """Claim and process shards until none are left unclaimed; returns how many this worker did"""
+        worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+        done = 0
+        for shard_id in self.shards():
+            if os.path.exists(self.output_path(shard_id)) or not self.claim(shard_id, worker):
+                continue
+            # Another worker may have published it between our check and our claim
+            if os.path.exists(self.output_path(shard_id)):
+                self.release(shard_id, worker)
+                continue
+            stop = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(shard_id, worker, stop), daemon=True).start()
+            try:
+                print(f"[{worker}] Processing shard {shard_id}")
+                self.process(shard_id, **kwargs)
+                done += 1
+            finally:
+                stop.set()
+                self.release(shard_id, worker)
+        print(f"[{worker}] Finished, {done} shards processed")
+        return done
+
+
+    def status(self) -> dict:
+        shards = self.shards()
+        finished = sum(os.path.exists(self.output_path(s)) for s in shards)
+        claimed = sum(os.path.exists(self.lock_path(s)) for s in shards)
+        return {'shards': len(shards), 'finished': finished, 'claimed': claimed, 'pending': len(shards) - finished - claimed}
+
+
+    def merge_sketches(self) -> dict[str, KLLSketch] | None:
+        """The shards' label-column sketches folded together in manifest order, so the result is repeatable"""
+        shards = self.shards()
+        if not all(os.path.exists(self.sketch_path(s)) for s in shards):
+            print("Some shards were processed without a sketch; labeling with exact quantiles instead")
+            return None
+        sketches = {col: KLLSketch() for col in LABEL_COLUMNS}
+        for shard_id in shards:
+            with open(self.sketch_path(shard_id)) as f:
+                for col, d in json.load(f).items():
+                    sketches[col].merge(KLLSketch.from_dict(d))
+        return sketches
+
+
+    def merge(self, out_dir: str = '.', parquet: bool = False) -> pd.DataFrame:
+        """Concatenate shard outputs in manifest order and label repos from the merged shard sketches"""
+        shards = self.shards()
+        missing = [s for s in shards if not os.path.exists(self.output_path(s))]
+        if missing:
+            raise RuntimeError(f"{len(missing)} of {len(shards)} shards are not finished yet, e.g. {missing[0]}")
+        df = pd.concat(
+            [pd.read_csv(self.output_path(s), dtype={**TEXT_COLUMNS, 'lemmas': str}) for s in shards],
+            ignore_index=True,
+        )
+        engineer = RepoFeatureEngineer.from_dataframe(df.drop(columns=README_FEATURES + ['lemmas']))
+        engineer.readme_lemmas = df['lemmas'].fillna('').tolist()
+        result = engineer.save_numeric_output(df[README_FEATURES], out_dir=out_dir, sketches=self.merge_sketches())
+        if parquet:
+            result.to_parquet(os.path.join(out_dir, 'repo_data_numbers.parquet'), index=False)
+        return result
+
+
+def run_local(raw_csv: str, work_dir: str, workers: int = 4, shard_size: int = 500, out_dir: str = '.'):
+    """Plan, run `workers` worker processes on this machine and merge: the single-box test setup"""
+    queue = ShardQueue(work_dir)
+    queue.plan(raw_csv, shard_size)
+    procs = [Process(target=queue.work, kwargs={'worker': f"local-{i}"}) for i in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return queue.merge(out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocess raw_repos.csv as shards claimed by any number of workers")
+    parser.add_argument('command', choices=['plan', 'work', 'status', 'merge', 'local'])
+    parser.add_argument('--raw', default='../data/raw_repos.csv')
+    parser.add_argument('--work-dir', default='../data/shards')
+    parser.add_argument('--shard-size', type=int, default=500)
+    parser.add_argument('--stale-after', type=float, default=STALE_AFTER, help="seconds before a silent claim is taken over")
+    parser.add_argument('--workers', type=int, default=4, help="worker processes for the local command")
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--parquet', action='store_true', help="also write repo_data_numbers.parquet on merge")
+    args = parser.parse_args()
+
+    queue = ShardQueue(args.work_dir, stale_after=args.stale_after)
+    if args.command == 'plan':
+        queue.plan(args.raw, args.shard_size)
+    elif args.command == 'work':
+        queue.work()
+    elif args.command == 'status':
+        print(queue.status())
+    elif args.command == 'merge':
+        queue.merge(args.out_dir, parquet=args.parquet)
+    else:
+        run_local(args.raw, args.work_dir, args.workers, args.shard_size, args.out_dir)
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "snapshots"))
+SNAPSHOT_COLUMNS = ['stars', 'forks', 'commits', 'contributors']
+GROWTH_WINDOW_DAYS = 30
+# Two snapshots closer together than this (e.g. a refresh minutes after a scrape) give no growth
+MIN_GROWTH_SPAN_DAYS = 1
+STATE_FIELDS = ['last', 'prev', 'last_t', 'prev_t']
+
+
+class SnapshotStore:
+    """Append-only per-run snapshots of repo counts.
+
+    Every scrape or refresh run is one immutable run-<id>.npz segment holding a
+    repo-index column plus one int64 column per metric (-1 = not observed).
+    repos.txt is the append-only registry mapping a repo index to owner/name.
+    state.npz keeps only the latest two observations of each metric per repo,
+    updated from each new segment, so growth never rescans older runs.
+    """
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.repo_ids = []
+        if os.path.exists(self._file('repos.txt')):
+            with open(self._file('repos.txt'), encoding='utf-8') as f:
+                self.repo_ids = f.read().splitlines()
+        self.index = {repo_id: i for i, repo_id in enumerate(self.repo_ids)}
+        self.runs = []
+        if os.path.exists(self._file('runs.json')):
+            with open(self._file('runs.json')) as f:
+                self.runs = json.load(f)
+        self.state = {}
+        if os.path.exists(self._file('state.npz')):
+            with np.load(self._file('state.npz')) as data:
+                self.state = {k: data[k] for k in data.files}
+        self._grow_state()
+
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+
+    def _grow_state(self):
+        n = len(self.repo_ids)
+        for c in SNAPSHOT_COLUMNS:
+            for field in STATE_FIELDS:
+                # Counts start unobserved (-1), timestamps at 0
+                is_count = field in ('last', 'prev')
+                dtype = np.int64 if is_count else np.float64
+                old = self.state.get(f"{c}_{field}", np.empty(0, dtype=dtype))
+                fill = np.full(n - len(old), -1 if is_count else 0, dtype=dtype)
+                self.state[f"{c}_{field}"] = np.concatenate([old, fill])
+
+
+    def _register(self, repo_ids: list[str]) -> np.ndarray:
+        new = [r for r in dict.fromkeys(repo_ids) if r not in self.index]
+        if new:
+            with open(self._file('repos.txt'), 'a', encoding='utf-8') as f:
+                f.write("".join(f"{r}\n" for r in new))
+            for r in new:
+                self.index[r] = len(self.repo_ids)
+                self.repo_ids.append(r)
+            self._grow_state()
+        return np.array([self.index[r] for r in repo_ids], dtype=np.int64)
+
+
+    def append(self, df: pd.DataFrame, taken_at: float | None = None, source: str = 'scrape') -> str:
+        """Record one run; `df` has owner, name and any of SNAPSHOT_COLUMNS"""
+        taken_at = time.time() if taken_at is None else taken_at
+        idx = self._register((df['owner'].astype(str) + '/' + df['name'].astype(str)).tolist())
+        columns = {
+            c: df[c].fillna(-1).to_numpy(dtype=np.int64) if c in df.columns else np.full(len(df), -1, dtype=np.int64)
+            for c in SNAPSHOT_COLUMNS
+        }
+        run_id = f"{len(self.runs):05d}"
+        np.savez(self._file(f"run-{run_id}.npz"), repo=idx, taken_at=np.float64(taken_at), **columns)
+        for c, values in columns.items():
+            seen = values >= 0
+            rows, values = idx[seen], values[seen]
+            for a, b in [('prev', 'last'), ('prev_t', 'last_t')]:
+                self.state[f"{c}_{a}"][rows] = self.state[f"{c}_{b}"][rows]
+            self.state[f"{c}_last"][rows] = values
+            self.state[f"{c}_last_t"][rows] = taken_at
+        np.savez(self._file('state.tmp.npz'), **self.state)
+        os.replace(self._file('state.tmp.npz'), self._file('state.npz'))
+        self.runs.append({'run_id': run_id, 'taken_at': taken_at, 'repos': len(df), 'source': source})
+        with open(self._file('runs.tmp.json'), 'w') as f:
+            json.dump(self.runs, f, indent=2)
+        os.replace(self._file('runs.tmp.json'), self._file('runs.json'))
+        print(f"Recorded snapshot run {run_id}: {len(df)} repos ({source})")
+        return run_id
+
+
+    def growth(self, window_days: int = GROWTH_WINDOW_DAYS, min_span_days: float = MIN_GROWTH_SPAN_DAYS) -> pd.DataFrame:
+        """Per repo, each metric's change between its last two snapshots scaled to `window_days`
+
+        Spans shorter than `min_span_days` are NaN rather than extrapolated;
+        snapshot_days still reports them.
+        """
+        owner_name = pd.Series(self.repo_ids, dtype=object).str.split('/', n=1, expand=True)
+        out = pd.DataFrame({
+            'owner': owner_name[0] if len(self.repo_ids) else [],
+            'name': owner_name[1] if len(self.repo_ids) else [],
+        })
+        for c in SNAPSHOT_COLUMNS:
+            days = (self.state[f"{c}_last_t"] - self.state[f"{c}_prev_t"]) / 86400
+            observed = (self.state[f"{c}_prev"] >= 0) & (days > 0)
+            valid = observed & (days >= min_span_days)
+            gained = (self.state[f"{c}_last"] - self.state[f"{c}_prev"]) / np.where(valid, days, 1) * window_days
+            out[f"{c}_gained_{window_days}d"] = np.where(valid, gained, np.nan)
+            if c == 'stars':
+                out['snapshot_days'] = np.where(observed, days, np.nan)
+        return out
+
+
+    def history(self, owner: str, name: str) -> pd.DataFrame:
+        """Every recorded observation of one repo (reads all segments; for inspection, not features)"""
+        i = self.index.get(f"{owner}/{name}")
+        rows = []
+        for run in self.runs if i is not None else []:
+            with np.load(self._file(f"run-{run['run_id']}.npz")) as seg:
+                for j in np.flatnonzero(seg['repo'] == i):
+                    rows.append({'taken_at': pd.to_datetime(run['taken_at'], unit='s'),
+                                 **{c: int(seg[c][j]) for c in SNAPSHOT_COLUMNS}})
+        return pd.DataFrame(rows, columns=['taken_at'] + SNAPSHOT_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh star/fork/commit snapshots and export growth features")
+    parser.add_argument('command', choices=['refresh', 'growth', 'runs'])
+    parser.add_argument('--store', default=SNAPSHOT_PATH)
+    parser.add_argument('--window-days', type=int, default=GROWTH_WINDOW_DAYS)
+    parser.add_argument('--min-span-days', type=float, default=MIN_GROWTH_SPAN_DAYS)
+    parser.add_argument('--out', default='repo_growth.csv')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    if args.command == 'refresh':
+        from selection import GitHubScraper, token
+        scraper = GitHubScraper(token, readme_index_path=None)
+        store.append(scraper.refresh_metadata(store.repo_ids), source='refresh')
+    elif args.command == 'growth':
+        store.growth(args.window_days, args.min_span_days).to_csv(args.out, index=False)
+        print(f"Saved growth features for {len(store.repo_ids)} repos to {args.out}")
+    else:
+        print(pd.DataFrame(store.runs).to_string())
@@ -0,0 +1,111 @@
+import json
+import numpy as np
+import pandas as pd
+from feature_registry import BINARY_FEATURES
+
+ALL = "__all__"
+QUANTILE_GRID = np.linspace(0, 1, 101)
+QUANTILE_COLUMNS = ["stars", "forks", "contributors", "commits", "token_count", "completeness_score"]
+HISTOGRAMS = {
+    "token_count": np.linspace(0, 3000, 101),
+    "stars": np.linspace(0, 5000, 101),
+}
+COUNT_COLUMNS = ["total_sections", "section_count", "header_count"]
+
+
+def _summarize(df: pd.DataFrame) -> dict:
+    group = {"n_rows": int(len(df)), "quantiles": {}, "histograms": {}, "counts": {}, "stars_by_feature": {}}
+    for col in QUANTILE_COLUMNS:
+        if col in df.columns:
+            group["quantiles"][col] = np.quantile(df[col], QUANTILE_GRID).tolist() if len(df) else []
+    for col, edges in HISTOGRAMS.items():
+        if col in df.columns:
+            # Last bin also catches everything above the top edge
+            counts, _ = np.histogram(np.clip(df[col], edges[0], edges[-1]), bins=edges)
+            group["histograms"][col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            group["counts"][col] = np.bincount(df[col].to_numpy(dtype=int)).tolist()
+    for feature in BINARY_FEATURES:
+        if feature not in df.columns:
+            continue
+        stats = {}
+        for value, stars in df.groupby(feature)["stars"]:
+            stats[str(int(value))] = {
+                "count": int(len(stars)),
+                "mean": float(stars.mean()),
+                "quantiles": np.quantile(stars, QUANTILE_GRID).tolist(),
+            }
+        group["stars_by_feature"][feature] = stats
+    return group
+
+
+class SummaryCube:
+    """Pre-aggregated histograms, quantile grids and star distributions, overall and per language"""
+    def __init__(self, data: dict):
+        self.data = data
+
+
+    @classmethod
+    def build(cls, df: pd.DataFrame):
+        groups = {ALL: _summarize(df)}
+        if "language" in df.columns:
+            for language, sub in df.groupby("language", observed=True):
+                groups[str(language)] = _summarize(sub)
+        return cls({"quantile_grid": QUANTILE_GRID.tolist(), "groups": groups})
+
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            return cls(json.load(f))
+
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.data, f)
+        print(f"Saved summary cube to {path}")
+
+
+    def _group(self, language: str | None) -> dict:
+        return self.data["groups"][language or ALL]
+
+
+    def languages(self) -> list[str]:
+        return [g for g in self.data["groups"] if g != ALL]
+
+
+    def count(self, language: str | None = None) -> int:
+        return self._group(language)["n_rows"]
+
+
+    def quantile(self, column: str, q, language: str | None = None):
+        """Interpolated from the stored 101-point quantile grid"""
+        return np.interp(q, self.data["quantile_grid"], self._group(language)["quantiles"][column])
+
+
+    def histogram(self, column: str, language: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        h = self._group(language)["histograms"][column]
+        return np.array(h["edges"]), np.array(h["counts"])
+
+
+    def value_counts(self, column: str, language: str | None = None, minlength: int = 0) -> np.ndarray:
+        counts = np.array(self._group(language)["counts"][column], dtype=int)
+        return np.pad(counts, (0, max(0, minlength - len(counts))))
+
+
+    def stars_by_feature(self, feature: str, language: str | None = None) -> pd.DataFrame:
+        rows = {}
+        for value, s in self._group(language)["stars_by_feature"][feature].items():
+            q = lambda p: float(np.interp(p, self.data["quantile_grid"], s["quantiles"]))
+            rows[int(value)] = {"count": s["count"], "mean": s["mean"], "p25": q(0.25), "median": q(0.5), "p75": q(0.75)}
+        return pd.DataFrame.from_dict(rows, orient="index").sort_index()
+
+
+if __name__ == "__main__":
+    cube = SummaryCube.load("../data/repo_data_summary.json")
+    print(f"{cube.count()} repos, languages: {', '.join(cube.languages())}")
+    print("Median stars:", cube.quantile("stars", 0.5))
+    for feature in BINARY_FEATURES:
+        print(f"\n{feature}")
+        print(cube.stars_by_feature(feature))
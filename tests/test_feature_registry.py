@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("textstat")
+pytest.importorskip("mistune")
+pytest.importorskip("textblob")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from feature_registry import _chunked_readability, _chunked_tokens, _readability
+
+TEXT = (
+    "This library parses configuration files for everyday automation tasks. "
+    "Install the package with your usual package manager before running the examples. "
+    "Documentation for every public function lives in the docs folder of this repository. "
+    "Contributions are welcome, so please open an issue before sending a large change. "
+    "Configuration supports comments, includes and environment variables. "
+    "This library parses configuration files for everyday automation tasks."
+)
+
+
+@pytest.mark.parametrize("chunk_chars", [len(TEXT), 200, 90])
+def test_chunked_readability_matches_whole_text(chunk_chars):
+    whole = _readability(TEXT)
+    chunked = _chunked_readability(TEXT, chunk_chars)
+    assert chunked.keys() == whole.keys()
+    for name, value in whole.items():
+        assert chunked[name] == pytest.approx(value, abs=0.01), name
+
+
+def test_chunked_tokens_returns_one_entry_per_text():
+    def provider(texts):
+        return [(len(t.split()), 1, 0, 0, t.split()[0].lower()) for t in texts]
+
+    short = "Tiny readme."
+    stats = _chunked_tokens(provider, 90)([TEXT, short, TEXT])
+    assert len(stats) == 3
+    assert stats[0] == stats[2]
+    assert stats[0][0] == len(TEXT.split())
+    assert stats[0][4].split() == ["this", "install", "documentation", "contributions", "configuration", "this"]
+    assert stats[1] == provider([short])[0]
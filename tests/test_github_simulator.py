@@ -0,0 +1,101 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+pytest.importorskip("langdetect")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+import selection
+from github_simulator import Corpus, GitHubSimulator
+from selection import GitHubScraper
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return Corpus.synthetic(2000, seed=7)
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    """Backoff sleeps, recorded instead of slept"""
+    waits = []
+    monkeypatch.setattr(selection.time, 'sleep', waits.append)
+    return waits
+
+
+def simulate(corpus, **kwargs):
+    sim = GitHubSimulator(corpus, **kwargs)
+    sim.start()
+    return sim
+
+
+def scrape(sim, path, target, **kwargs):
+    scraper = GitHubScraper('simulated', readme_index_path=None, api_url=sim.url, session=requests.Session())
+    repos = scraper.scrape_repos(target_count=target, output_path=str(path), **kwargs)
+    return scraper, repos
+
+
+def test_contributors_pages_and_rate_limit_headers(corpus):
+    row = corpus.repos['contributors'].idxmax()
+    owner, name, count = corpus.repos.loc[row, ['owner', 'name', 'contributors']]
+    sim = simulate(corpus, rest_rate_limit=3)
+    try:
+        url = f"{sim.url}/repos/{owner}/{name}/contributors"
+        first = requests.get(url, params={'per_page': 2})
+        second = requests.get(url, params={'per_page': 2, 'page': 2})
+        limited = requests.get(url, params={'per_page': 2})
+        blocked = requests.get(url, params={'per_page': 2})
+    finally:
+        sim.stop()
+    assert [c['login'] for c in first.json()] == ['contributor0', 'contributor1']
+    assert [c['login'] for c in second.json()] == ['contributor2', 'contributor3'][:count - 2]
+    assert f'page={-(-count // 2)}>; rel="last"' in first.headers['Link']
+    assert 'rel="prev"' in second.headers['Link'] and 'rel="prev"' not in first.headers['Link']
+    assert first.headers['X-RateLimit-Remaining'] == '2' and limited.headers['X-RateLimit-Remaining'] == '0'
+    assert blocked.status_code == 403 and blocked.headers['X-RateLimit-Reset'].isdigit()
+
+
+def test_two_phase_downloads_fewer_readmes(corpus, tmp_path, waits):
+    counts = {}
+    for two_phase in (False, True):
+        sim = simulate(corpus)
+        try:
+            scraper, repos = scrape(sim, tmp_path / f"{two_phase}.csv", 40, two_phase=two_phase)
+        finally:
+            sim.stop()
+        assert len(repos) == 40
+        counts[two_phase] = (scraper.readme_downloads, sim.stats)
+    single_downloads, single_stats = counts[False]
+    two_phase_downloads, two_phase_stats = counts[True]
+    # Single-phase gets every README inside the search pages; two-phase only for repos that pass the metadata checks
+    assert single_stats['readmes'] == 0 and two_phase_stats['readmes'] > 0
+    assert two_phase_downloads < single_downloads
+    assert two_phase_stats['count'] == single_stats['count']
+
+
+def test_backs_off_on_injected_403_and_429(corpus, tmp_path, waits):
+    sim = simulate(corpus, error_rate=0.2, seed=3)
+    try:
+        _, repos = scrape(sim, tmp_path / 'raw_repos.csv', 30, two_phase=True)
+    finally:
+        sim.stop()
+    assert len(repos) == 30
+    assert sim.stats['injected_errors'] > 0
+    assert len(waits) >= sim.stats['injected_errors'] // 2
+
+
+def test_resume_keeps_rows_and_skips_seen_repos(corpus, tmp_path, waits):
+    path = tmp_path / 'raw_repos.csv'
+    sim = simulate(corpus)
+    try:
+        scrape(sim, path, 20, two_phase=True)
+        first = pd.read_csv(path)
+        _, repos = scrape(sim, path, 45, two_phase=True, resume=True)
+    finally:
+        sim.stop()
+    resumed = pd.read_csv(path)
+    assert len(repos) == 45 and len(resumed) == 45
+    assert not resumed.duplicated(['owner', 'name']).any()
+    pd.testing.assert_frame_equal(resumed.head(20), first)
@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+pytest.importorskip("langdetect")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from github_simulator import Corpus, GitHubSimulator
+from http_cache import CachedSession
+from selection import GitHubScraper
+
+
+class EtagStub:
+    """One REST resource whose ETag changes with `version`"""
+    def __init__(self):
+        self.version = 1
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag = f'"v{stub.version}"'
+                if self.headers.get('If-None-Match') == etag:
+                    stub.statuses.append(304)
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                body = json.dumps([{'login': f"contributor{i}"} for i in range(stub.version)]).encode('utf-8')
+                stub.statuses.append(200)
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/repos/o/n/contributors"
+
+
+@pytest.fixture
+def stub():
+    stub = EtagStub()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+@pytest.fixture
+def simulator():
+    sim = GitHubSimulator(Corpus.synthetic(40, seed=1, duplicate_rate=0.0, empty_rate=0.0))
+    sim.start()
+    yield sim
+    sim.stop()
+
+
+def test_get_revalidates_with_etag(stub, tmp_path):
+    http = CachedSession(str(tmp_path / 'cache.sqlite'))
+    assert len(http.get(stub.url).json()) == 1
+    again = http.get(stub.url)
+    assert again.json() == [{'login': 'contributor0'}]
+    assert getattr(again, 'from_cache', False)
+    stub.version = 2
+    assert len(http.get(stub.url).json()) == 2
+    assert stub.statuses == [200, 304, 200]
+    assert http.stats['revalidated'] == 1 and http.stats['miss'] == 2
+
+
+def test_readme_blobs_are_reused_until_edited(simulator, tmp_path):
+    repos = simulator.corpus.repos
+    repo_ids = (repos['owner'] + '/' + repos['name']).tolist()
+    http = CachedSession(str(tmp_path / 'cache.sqlite'))
+
+    def fetch():
+        scraper = GitHubScraper('simulated', readme_index_path=None, api_url=simulator.url, session=http)
+        return scraper.fetch_readmes(repo_ids, batch_size=10), scraper.readme_downloads
+
+    first, downloaded = fetch()
+    assert downloaded == len(repo_ids)
+    assert first == dict(zip(repo_ids, repos['readme']))
+    second, downloaded = fetch()
+    assert downloaded == 0 and second == first
+    repos.at[3, 'readme'] = "# Edited\n\nThis README changed since the last run."
+    third, downloaded = fetch()
+    assert downloaded == 1
+    assert third[repo_ids[3]] == repos.at[3, 'readme']
+    assert http.stats['blob_hit'] == 2 * len(repo_ids) - 1
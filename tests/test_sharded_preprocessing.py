@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import time
+from multiprocessing import Process
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("textstat")
+pytest.importorskip("mistune")
+pytest.importorskip("textblob")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from github_simulator import Corpus
+from sharded_preprocessing import ShardQueue
+
+STALE_AFTER = 1.0
+
+
+class LoggedQueue(ShardQueue):
+    """ShardQueue that appends one line per processed shard to a log shared by all workers"""
+    def process(self, shard_id, **kwargs):
+        with open(os.path.join(self.work_dir, 'processed.log'), 'a') as f:
+            f.write(f"{shard_id}\n")
+        super().process(shard_id, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def raw_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("raw") / "raw_repos.csv"
+    repos = Corpus.synthetic(120, seed=5).repos
+    repos[repos['readme'] != ''].drop(columns=['is_fork']).to_csv(path, index=False)
+    return str(path)
+
+
+def plan(raw_csv, work_dir):
+    queue = LoggedQueue(str(work_dir), stale_after=STALE_AFTER)
+    return queue, queue.plan(raw_csv, shard_size=20)
+
+
+def fake_dead_lock(queue, shard_id, age=10 * STALE_AFTER):
+    """A lock left behind by a worker that died mid-shard"""
+    path = queue.lock_path(shard_id)
+    with open(path, 'w') as f:
+        json.dump({'worker': 'dead', 'host': 'gone', 'pid': -1, 'claimed_at': time.time() - age}, f)
+    os.utime(path, (time.time() - age, time.time() - age))
+
+
+def run_workers(queue, n):
+    procs = [Process(target=queue.work, kwargs={'worker': f"w{i}"}) for i in range(n)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(120)
+        assert p.exitcode == 0
+
+
+def processed(queue):
+    with open(os.path.join(queue.work_dir, 'processed.log')) as f:
+        return f.read().split()
+
+
+def test_two_workers_process_each_shard_once(raw_csv, tmp_path):
+    queue, shards = plan(raw_csv, tmp_path / 'work')
+    # Every shard starts out held by a dead worker, so both workers race for each takeover
+    for shard_id in shards:
+        fake_dead_lock(queue, shard_id)
+    run_workers(queue, 2)
+    assert sorted(processed(queue)) == sorted(shards)
+    assert queue.status() == {'shards': len(shards), 'finished': len(shards), 'claimed': 0, 'pending': 0}
+    assert not [f for f in os.listdir(queue.claim_dir) if '.stale-' in f]
+
+
+def test_fresh_lock_is_not_taken_over(raw_csv, tmp_path):
+    queue, shards = plan(raw_csv, tmp_path / 'work')
+    assert queue.claim(shards[0], 'alive')
+    assert not queue.claim(shards[0], 'other')
+    fake_dead_lock(queue, shards[1])
+    assert queue.claim(shards[1], 'other')
+    assert queue.owner(shards[0]) == 'alive' and queue.owner(shards[1]) == 'other'
+
+
+def test_stalled_worker_does_not_release_its_successors_lock(raw_csv, tmp_path):
+    queue, shards = plan(raw_csv, tmp_path / 'work')
+    assert queue.claim(shards[0], 'stalled')
+    old = time.time() - 10 * STALE_AFTER
+    os.utime(queue.lock_path(shards[0]), (old, old))
+    assert queue.claim(shards[0], 'successor')
+    assert not queue.release(shards[0], 'stalled')
+    assert queue.owner(shards[0]) == 'successor'
+    assert queue.release(shards[0], 'successor') and queue.owner(shards[0]) is None
+
+
+def test_merge_is_deterministic(raw_csv, tmp_path):
+    merged = []
+    for workers in (1, 3):
+        queue, _ = plan(raw_csv, tmp_path / f"work{workers}")
+        run_workers(queue, workers)
+        out_dir = tmp_path / f"out{workers}"
+        out_dir.mkdir()
+        queue.merge(str(out_dir))
+        merged.append((out_dir / 'repo_data_numbers.csv').read_bytes())
+    assert merged[0] == merged[1]